@@ -0,0 +1,101 @@
+"""
+zkHetz Feed Archive
+Record/replay of raw feed responses. A recording run stores every feed body
+it downloads (decoded bytes plus status and headers) in one gzip JSONL file
+per run; a replay run serves the same responses from that file instead of
+the network, so the parser and collector can be re-run offline on exactly
+the same inputs.
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+from requests.structures import CaseInsensitiveDict
+from config.sources import normalize_url
+
+ARCHIVE_DIR = os.getenv("COLLECTOR_ARCHIVE_DIR", ".collector_archive")
+
+
+class NotArchived(Exception):
+    """Raised in replay when a feed URL is not in the archive."""
+
+
+class ArchivedResponse:
+    """The parts of a requests.Response the collector reads, rebuilt from an archive."""
+    
+    __slots__ = ("url", "status_code", "headers", "content")
+    
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+
+def new_archive_path(now=None) -> str:
+    """Path of a new per-run archive file in ARCHIVE_DIR."""
+    now = now or datetime.utcnow()
+    return os.path.join(ARCHIVE_DIR, f"feeds-{now:%Y%m%dT%H%M%S}.jsonl.gz")
+
+
+class FeedRecorder:
+    """Appends downloaded feed responses to an archive file (thread-safe)."""
+    
+    replaying = False
+    
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.count = 0
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+    
+    def record(self, url, response, content):
+        """Store one response; `content` is the decoded body."""
+        line = json.dumps({
+            "url": url,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "content": base64.b64encode(content).decode("ascii"),
+            "fetched_at": datetime.utcnow().isoformat(),
+        })
+        with self.lock:
+            self.file.write(line + "\n")
+            self.count += 1
+    
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class FeedReplay:
+    """Serves feed responses from an archive file, keyed by normalized URL."""
+    
+    replaying = True
+    
+    def __init__(self, path):
+        self.path = path
+        self.responses = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self.responses[normalize_url(record["url"])] = ArchivedResponse(
+                    record["url"], record["status"], record["headers"], base64.b64decode(record["content"]))
+    
+    def __len__(self):
+        return len(self.responses)
+    
+    def response(self, url) -> ArchivedResponse:
+        """Archived response for a feed URL (raises NotArchived)."""
+        try:
+            return self.responses[normalize_url(url)]
+        except KeyError:
+            raise NotArchived(url)
+    
+    def close(self):
+        pass
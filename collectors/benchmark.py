@@ -0,0 +1,268 @@
+"""
+zkHetz Collector Benchmark
+Runs collect_all_feeds against a local synthetic feed server and reports
+feeds/sec, per-feed latency (p50/p95), CPU time spent parsing and peak
+memory for each collection mode. Feeds are generated from a fixed seed and
+every mode runs in a fresh process with an empty state dir, so numbers are
+comparable run to run.
+
+    python -m collectors.benchmark --feeds 200 --hosts 8 --latency 50 --modes serial,threads,pipelined
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+# Collection modes: collect_all_feeds keyword arguments
+MODES = {
+    "serial": {"workers": 1},
+    "threads": {"workers": 16},
+    "pipelined": {"workers": 16, "parse_workers": os.cpu_count() or 2},
+    "stream": {"workers": 16, "stream": True},
+    "feedparser": {"workers": 16, "parser": "feedparser"},
+}
+
+RESULT_FILE = "benchmark_result.json"
+
+WORDS = "threat actor ransomware campaign patch advisory exploit vulnerability sanctions policy cloud model".split()
+
+
+# =============================================================================
+# SYNTHETIC FEEDS
+# =============================================================================
+
+def filler_text(rng, size) -> str:
+    """Roughly `size` characters of words."""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def make_feed(index, fmt, item_count, item_size, rng) -> bytes:
+    """An RSS 2.0 or Atom document with `item_count` entries of ~`item_size` bytes."""
+    newest = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    entries = []
+    for i in range(item_count):
+        title = escape(f"Feed {index} item {i}: {filler_text(rng, 40)}")
+        link = f"https://bench.example/{index}/{i}"
+        text = escape(f"<p>{filler_text(rng, item_size)}</p>")
+        published = newest - timedelta(hours=6 * i)
+        if fmt == "atom":
+            entries.append(f"<entry><title>{title}</title><link href=\"{link}\"/><id>{link}</id>"
+                           f"<updated>{published.isoformat()}</updated><summary>{text}</summary></entry>")
+        else:
+            entries.append(f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+                           f"<pubDate>{published.strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate>"
+                           f"<description>{text}</description></item>")
+    
+    if fmt == "atom":
+        doc = (f"<?xml version=\"1.0\"?><feed xmlns=\"http://www.w3.org/2005/Atom\">"
+               f"<title>Bench {index}</title>{''.join(entries)}</feed>")
+    else:
+        doc = (f"<?xml version=\"1.0\"?><rss version=\"2.0\"><channel><title>Bench {index}</title>"
+               f"{''.join(entries)}</channel></rss>")
+    return doc.encode("utf-8")
+
+
+def build_feeds(args) -> list:
+    """Feed specs (host, path, status, body, latency) generated from `args.seed`."""
+    rng = random.Random(args.seed)
+    feeds = []
+    for i in range(args.feeds):
+        host = i % args.hosts
+        fmt = "atom" if rng.random() < args.atom_ratio else "rss"
+        failing = rng.random() < args.error_rate
+        latency = (args.latency + rng.uniform(0, args.jitter)) / 1000
+        if host < args.slow_hosts:
+            latency += args.slow_latency / 1000
+        body = b"" if failing else make_feed(i, fmt, args.items, args.item_size, rng)
+        feeds.append({"host": host, "path": f"/feed/{i}", "status": 500 if failing else 200,
+                      "body": body, "latency": latency})
+    return feeds
+
+
+def start_servers(feeds, host_count) -> list:
+    """One threaded HTTP server per synthetic host (distinct ports); returns the servers."""
+    servers = []
+    for host in range(host_count):
+        routes = {f["path"]: f for f in feeds if f["host"] == host}
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            feed_routes = routes
+            
+            def do_GET(self):
+                feed = self.feed_routes.get(self.path)
+                if feed is None:
+                    self.send_error(404)
+                    return
+                time.sleep(feed["latency"])
+                self.send_response(feed["status"])
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(feed["body"])))
+                self.end_headers()
+                self.wfile.write(feed["body"])
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+# =============================================================================
+# RUNS
+# =============================================================================
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers, or 0."""
+    values = sorted(values)
+    if not values:
+        return 0
+    rank = max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def peak_memory_mb(who) -> float:
+    """Peak RSS of this process (RUSAGE_SELF) or its reaped children, in MB."""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_child(spec):
+    """Benchmark one mode in this (fresh) process; writes the result to the state dir."""
+    # Imported here so COLLECTOR_STATE_DIR from the parent is picked up
+    import collectors.rss_collector as rss_collector
+    from collectors.seen_index import SeenIndex
+    from collectors.sharding import read_shard_items
+    from collectors.state import state_path
+    from config.sources import RSSSource, SourceCategory
+    
+    SeenIndex().save()  # Empty index, so no rebuild from the database
+    if spec["host_rate"]:
+        rss_collector.DEFAULT_HOST_RATE_LIMIT = (spec["host_rate"], max(1, int(spec["host_rate"])))
+    
+    sources = [RSSSource(f"Bench {i}", url, SourceCategory.CYBER_ATTACKS) for i, url in enumerate(spec["urls"])]
+    results = []
+    
+    started = time.perf_counter()
+    output = state_path("items.jsonl.gz")
+    with contextlib.redirect_stdout(io.StringIO()):
+        rss_collector.collect_all_feeds(sources=sources, use_cache=False, full_sweep=True, output=output,
+                                        on_results=results.extend, **MODES[spec["mode"]])
+    wall = time.perf_counter() - started
+    
+    latencies_ms = [r.elapsed * 1000 for r in results]
+    result = {
+        "mode": spec["mode"],
+        "wall": wall,
+        "feeds_per_sec": len(results) / wall if wall else 0,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "parse_cpu": sum(r.parse_time for r in results),
+        "peak_mb": peak_memory_mb(resource.RUSAGE_SELF),
+        "peak_workers_mb": peak_memory_mb(resource.RUSAGE_CHILDREN),
+        "ok": sum(r.status == rss_collector.STATUS_OK for r in results),
+        "failed": sum(r.status == rss_collector.STATUS_FAILED for r in results),
+        "items": sum(1 for _ in read_shard_items([output])),
+    }
+    with open(state_path(RESULT_FILE), "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def run_mode(mode, urls, host_rate) -> dict:
+    """Run one mode in a subprocess with its own empty state dir."""
+    with tempfile.TemporaryDirectory(prefix="zkhetz-bench-") as state_dir:
+        env = {**os.environ, "COLLECTOR_STATE_DIR": state_dir}
+        spec = json.dumps({"mode": mode, "urls": urls, "host_rate": host_rate})
+        subprocess.run([sys.executable, "-m", "collectors.benchmark", "--child"], input=spec, text=True,
+                       env=env, stdout=subprocess.DEVNULL, check=True)
+        with open(os.path.join(state_dir, RESULT_FILE), encoding="utf-8") as f:
+            return json.load(f)
+
+
+def print_report(results):
+    print(f"{'Mode':<12} {'Feeds/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'Parse CPU s':>12} "
+          f"{'Peak MB':>8} {'Workers MB':>11} {'OK':>5} {'Failed':>7} {'Items':>7}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['feeds_per_sec']:>8.1f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+              f"{r['parse_cpu']:>12.2f} {r['peak_mb']:>8.1f} {r['peak_workers_mb']:>11.1f} "
+              f"{r['ok']:>5} {r['failed']:>7} {r['items']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="zkHetz Collector Benchmark")
+    parser.add_argument("--modes", default="serial,threads,pipelined,stream",
+                        help=f"Comma-separated modes ({', '.join(MODES)})")
+    parser.add_argument("--feeds", type=int, default=100, help="Number of synthetic feeds")
+    parser.add_argument("--hosts", type=int, default=8, help="Number of synthetic hosts the feeds are spread over")
+    parser.add_argument("--items", type=int, default=30, help="Entries per feed")
+    parser.add_argument("--item-size", type=int, default=1000, help="Approximate bytes of text per entry")
+    parser.add_argument("--atom-ratio", type=float, default=0.3, help="Fraction of feeds served as Atom")
+    parser.add_argument("--latency", type=float, default=50, help="Base response latency in ms")
+    parser.add_argument("--jitter", type=float, default=50, help="Extra random latency in ms (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of feeds answering HTTP 500")
+    parser.add_argument("--slow-hosts", type=int, default=1, help="Number of hosts with extra latency")
+    parser.add_argument("--slow-latency", type=float, default=1000, help="Extra latency of slow hosts in ms")
+    parser.add_argument("--host-rate", type=float, default=1000,
+                        help="Per-host requests/sec for the rate limiter (0 = configured politeness limits)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode (the median run is reported)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic feeds")
+    parser.add_argument("--json", type=str, help="Also write the results to this JSON file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(json.load(sys.stdin))
+        raise SystemExit(0)
+    
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    
+    feeds = build_feeds(args)
+    servers = start_servers(feeds, args.hosts)
+    urls = [f"http://127.0.0.1:{servers[f['host']].server_port}{f['path']}" for f in feeds]
+    
+    print("=" * 60)
+    print("zkHetz Collector Benchmark")
+    print("=" * 60)
+    print(f"Feeds: {args.feeds} on {args.hosts} hosts ({args.slow_hosts} slow) | Items/feed: {args.items} | "
+          f"Body: ~{statistics.mean(len(f['body']) for f in feeds) / 1024:.0f} KB")
+    print(f"Latency: {args.latency:.0f}+{args.jitter:.0f} ms | Errors: {args.error_rate:.0%} | Seed: {args.seed}")
+    print("=" * 60 + "\n")
+    
+    results = []
+    for mode in modes:
+        runs = sorted((run_mode(mode, urls, args.host_rate) for _ in range(max(args.repeat, 1))),
+                      key=lambda r: r["wall"])
+        results.append(runs[len(runs) // 2])
+    
+    print_report(results)
+    for server in servers:
+        server.shutdown()
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
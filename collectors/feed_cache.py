@@ -0,0 +1,61 @@
+"""
+zkHetz Feed Cache
+Per-feed HTTP validators (ETag, Last-Modified, body hash) used to make
+conditional GET requests, so unchanged feeds are neither downloaded nor parsed.
+"""
+
+import hashlib
+from collectors.state import load_state, save_state
+
+VALIDATORS_FILE = "validators.json"
+
+
+class NotModified(Exception):
+    """Raised when a feed has not changed since the last successful run."""
+
+
+def load_validators() -> dict:
+    """Load {url: {"etag", "last_modified", "body_hash"}} from the state dir."""
+    return load_state(VALIDATORS_FILE)
+
+
+def save_validators(validators):
+    """Persist validators for the next run."""
+    save_state(VALIDATORS_FILE, validators)
+
+
+def body_hash(content) -> str:
+    """Stable hash of a feed body, for servers that ignore validators."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def conditional_headers(cached) -> dict:
+    """Request headers for a conditional GET, given cached validators."""
+    headers = {}
+    if not cached:
+        return headers
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def check_response(response, cached, content=None) -> dict:
+    """
+    Check a feed response (and its body, if read separately) against cached validators.
+    Raises NotModified on 304 or an identical body, otherwise returns
+    the validators to store once the feed's items have been saved.
+    """
+    if response.status_code == 304:
+        raise NotModified()
+    
+    digest = body_hash(response.content if content is None else content)
+    if cached and cached.get("body_hash") == digest:
+        raise NotModified()
+    
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "body_hash": digest,
+    }
@@ -0,0 +1,128 @@
+"""
+zkHetz Fast Feed Parser
+Streaming parser for well-formed RSS 2.0, RSS 1.0 (RDF) and Atom documents.
+Stops after the first N entries and extracts only the fields the collector
+uses (id, title, link, summary, content, dates). Returns entries shaped like
+feedparser's, or None when the document should go through feedparser instead
+(malformed XML, HTML entities, unknown format).
+"""
+
+import io
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import iterparse, ParseError
+from feedparser import FeedParserDict
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+# Root elements we know how to read: (namespace, local name)
+FEED_ROOTS = {("", "rss"), (ATOM_NS, "feed"), ("http://www.w3.org/1999/02/22-rdf-syntax-ns#", "RDF")}
+
+# Entry elements per format: (namespace, local name)
+ENTRY_TAGS = {("", "item"), (RSS1_NS, "item"), (ATOM_NS, "entry")}
+
+
+def split_tag(tag):
+    """Split '{ns}local' into (ns, local)."""
+    if tag[:1] == "{":
+        ns, local = tag[1:].split("}", 1)
+        return ns, local
+    return "", tag
+
+
+def parse_date(text):
+    """Parse an RFC 822 or ISO 8601 date into a UTC struct_time, or None."""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.timetuple()
+
+
+def element_text(elem) -> str:
+    """Text of an element, flattening any inline (xhtml) children."""
+    if len(elem):
+        return "".join(elem.itertext()).strip()
+    return (elem.text or "").strip()
+
+
+def read_entry(elem) -> FeedParserDict:
+    """Extract the fields the collector uses from an <item>/<entry> element."""
+    entry = FeedParserDict()
+    other_title = None
+    guid_is_link = False
+    for child in elem:
+        ns, local = split_tag(child.tag)
+        
+        if local == "title" and ns in ("", RSS1_NS, ATOM_NS, DC_NS):
+            entry.setdefault("title", element_text(child))
+        elif local == "title" and other_title is None:
+            other_title = element_text(child)  # e.g. media:title, used if there's no title
+        elif local == "link" and ns == ATOM_NS:
+            if child.get("rel", "alternate") == "alternate" and "link" not in entry:
+                entry["link"] = child.get("href", "")
+        elif local == "link" and ns in ("", RSS1_NS) and "link" not in entry:
+            entry["link"] = element_text(child)
+        elif ((ns, local) in (("", "guid"), (ATOM_NS, "id"))) and "id" not in entry:
+            entry["id"] = element_text(child)
+            # Like feedparser, a guid is the link unless isPermaLink says otherwise
+            permalink = {k.lower(): v for k, v in child.attrib.items()}.get("ispermalink", "true")
+            guid_is_link = permalink == "true"
+        elif local in ("description", "summary") and ns in ("", RSS1_NS, ATOM_NS):
+            entry["summary"] = element_text(child)
+        elif (ns, local) in ((CONTENT_NS, "encoded"), (ATOM_NS, "content")):
+            entry["content"] = [FeedParserDict(value=element_text(child))]
+        elif local in ("pubDate", "published", "issued") or (ns, local) == (DC_NS, "date"):
+            entry["published_parsed"] = parse_date(child.text)
+        elif local in ("updated", "modified"):
+            entry["updated_parsed"] = parse_date(child.text)
+    
+    if "title" not in entry and other_title is not None:
+        entry["title"] = other_title
+    if "link" not in entry and guid_is_link and entry.get("id"):
+        entry["link"] = entry["id"]
+    # RDF items carry their link in rdf:about
+    if "link" not in entry:
+        about = elem.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about")
+        if about:
+            entry["link"] = about
+    return entry
+
+
+def parse_entries(content, limit=15):
+    """
+    Parse up to `limit` entries from a feed document.
+    Returns a list of feedparser-style entries, or None if the document
+    isn't well-formed RSS/Atom and should be parsed by feedparser.
+    """
+    entries = []
+    root_checked = False
+    try:
+        for event, elem in iterparse(io.BytesIO(content), events=("start", "end")):
+            if not root_checked:
+                if split_tag(elem.tag) not in FEED_ROOTS:
+                    return None
+                root_checked = True
+                continue
+            if event != "end" or split_tag(elem.tag) not in ENTRY_TAGS:
+                continue
+            
+            entries.append(read_entry(elem))
+            elem.clear()
+            if len(entries) >= limit:
+                break
+    except ParseError:
+        return None
+    
+    return entries or None
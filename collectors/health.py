@@ -0,0 +1,91 @@
+"""
+zkHetz Source Health Ledger
+Per-feed success rate, latency percentiles and last error, plus a circuit
+breaker: after repeated failures a feed is skipped with exponential backoff,
+then probed once when the backoff expires. Healthy feeds don't pay the
+timeout of broken ones.
+"""
+
+from datetime import datetime, timedelta
+from collectors.state import load_state, save_state
+
+HEALTH_FILE = "health.json"
+
+HISTORY_SIZE = 20            # Recent outcomes/latencies kept per feed
+FAILURE_THRESHOLD = 3        # Consecutive failures before the breaker opens
+BASE_BACKOFF_HOURS = 24      # First backoff; doubles with every further failure
+MAX_BACKOFF_HOURS = 7 * 24
+
+# Breaker states
+CLOSED = "closed"        # Healthy, fetch normally
+HALF_OPEN = "half_open"  # Backoff expired, probe once
+OPEN = "open"            # Skip this run
+
+
+def load_health() -> dict:
+    """Load the health ledger {feed_url: record} from the state dir."""
+    return load_state(HEALTH_FILE)
+
+
+def save_health(health):
+    """Persist the health ledger."""
+    save_state(HEALTH_FILE, health)
+
+
+def breaker_state(record, now) -> str:
+    """Circuit breaker state of a feed for this run."""
+    if not record or record.get("consecutive_failures", 0) < FAILURE_THRESHOLD:
+        return CLOSED
+    open_until = record.get("open_until")
+    if open_until and now < datetime.fromisoformat(open_until):
+        return OPEN
+    return HALF_OPEN
+
+
+def record_result(health, key, ok, elapsed, error, now):
+    """Record one fetch outcome and update the breaker."""
+    record = health.setdefault(key, {"outcomes": [], "latencies_ms": [], "consecutive_failures": 0})
+    record["outcomes"] = (record.get("outcomes", []) + [1 if ok else 0])[-HISTORY_SIZE:]
+    record["latencies_ms"] = (record.get("latencies_ms", []) + [round(elapsed * 1000)])[-HISTORY_SIZE:]
+    record["last_attempt"] = now.isoformat()
+    
+    if ok:
+        record["consecutive_failures"] = 0
+        record["last_success"] = now.isoformat()
+        record.pop("open_until", None)
+        return
+    
+    record["consecutive_failures"] = record.get("consecutive_failures", 0) + 1
+    record["last_error"] = error
+    extra_failures = record["consecutive_failures"] - FAILURE_THRESHOLD
+    if extra_failures >= 0:
+        backoff = min(BASE_BACKOFF_HOURS * 2 ** extra_failures, MAX_BACKOFF_HOURS)
+        record["open_until"] = (now + timedelta(hours=backoff)).isoformat()
+
+
+def success_rate(record) -> float:
+    """Share of recent fetches that succeeded."""
+    outcomes = record.get("outcomes", [])
+    return sum(outcomes) / len(outcomes) if outcomes else 0.0
+
+
+def latency_percentile(record, pct):
+    """Recent latency percentile in ms (nearest rank), or None."""
+    latencies = sorted(record.get("latencies_ms", []))
+    if not latencies:
+        return None
+    rank = max(0, min(len(latencies) - 1, round(pct / 100 * len(latencies)) - 1))
+    return latencies[rank]
+
+
+if __name__ == "__main__":
+    health = load_health()
+    now = datetime.utcnow()
+    print("=" * 90)
+    print("zkHetz Source Health")
+    print("=" * 90)
+    print(f"{'Feed':<50} {'OK%':>5} {'p50ms':>7} {'p95ms':>7} {'State':>10}  Last error")
+    for key, record in sorted(health.items(), key=lambda x: success_rate(x[1])):
+        print(f"{key[:50]:<50} {success_rate(record) * 100:>4.0f}% "
+              f"{latency_percentile(record, 50) or 0:>7} {latency_percentile(record, 95) or 0:>7} "
+              f"{breaker_state(record, now):>10}  {record.get('last_error') or '-'}")
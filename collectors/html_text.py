@@ -0,0 +1,72 @@
+"""
+zkHetz HTML to Text
+Fast, regex-based conversion of feed summaries/content (HTML) to plain
+text at ingest: drops markup, scripts and styles, decodes entities,
+collapses whitespace and removes feed boilerplate such as WordPress's
+"The post X appeared first on Y". Block elements become line breaks so
+paragraphs stay apart.
+"""
+
+import re
+from html import unescape
+
+DROP_BLOCKS = re.compile(r"<(script|style|noscript|iframe|svg)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+BLOCK_ELEMENTS = "p|div|br|li|ul|ol|h[1-6]|tr|table|blockquote|pre|section|article|figure|figcaption|hr"
+BLOCK_TAGS = re.compile(r"</?(%s)\b[^>]*>" % BLOCK_ELEMENTS, re.I)
+
+# Only markup is removed: "<" plus a known element name, a prefixed name like
+# Office's <o:p>, or "!" (doctypes), so plain-text comparisons such as
+# "x<y and z>w" or "<2.4.1" survive
+HTML_ELEMENTS = (
+    "a abbr acronym address area aside audio b base bdi bdo big blink body button canvas caption center cite "
+    "code col colgroup data dd del details dfn dialog dl dt em embed fieldset font footer form header html img "
+    "input ins kbd label legend link main map mark meta meter nav object optgroup option output param picture "
+    "progress q rp rt ruby s samp select small source span strike strong sub summary sup tbody td template "
+    "textarea tfoot th thead time title track tt u var video wbr"
+).split()
+TAGS = re.compile(
+    r"<(?:/?(?:%s|%s|[a-z]+:\w+)(?=[\s/>])[^<>]*|![^<>]*)>" % ("|".join(HTML_ELEMENTS), BLOCK_ELEMENTS),
+    re.I,
+)
+
+READ_MORE = r"(Continue reading|Read more|Read the full (story|article))"
+MORE_MARK = r"(\.\.\.|…|»|→|›)"
+
+# A trailing "Read more" link, removed from the HTML before tags are stripped
+READ_MORE_LINK = re.compile(r"<a\b[^>]*>\s*" + READ_MORE + r"[^<]{0,80}</a>(\s*</?(p|div|span|br)\b[^>]*>)*\s*$", re.I)
+
+# Trailing feed boilerplate, matched against the last BOILERPLATE_TAIL characters of the text
+BOILERPLATE_TAIL = 600
+BOILERPLATE = [
+    re.compile(r"The post .{1,300}? appeared first on .{1,200}?\.?$", re.S),
+    # Only as its own line: bare, or marked with an ellipsis/arrow ("Read more »", "Continue reading on X →")
+    re.compile(r"(^|\n)" + READ_MORE + r"(\s*" + MORE_MARK + r"[^\n]{0,120}|[^\n]{0,80}" + MORE_MARK +
+               r"|[\s:.!]*)$", re.I),
+    re.compile(r"\[(…|\.\.\.|&hellip;)\]$"),
+]
+
+
+def normalize_whitespace(text) -> str:
+    """Collapse runs of spaces and blank lines; strip the ends."""
+    return "\n".join(filter(None, (" ".join(line.split()) for line in text.splitlines())))
+
+
+def html_to_text(html) -> str:
+    """Plain text of an HTML fragment (entities decoded, boilerplate removed)."""
+    if not html:
+        return ""
+    text = html
+    if "<" in text:
+        text = DROP_BLOCKS.sub(" ", text)
+        head, tail = text[:-BOILERPLATE_TAIL], text[-BOILERPLATE_TAIL:]
+        text = head + READ_MORE_LINK.sub("", tail)
+        text = BLOCK_TAGS.sub("\n", text)
+        text = TAGS.sub(" ", text)
+    if "&" in text:
+        text = unescape(text)
+    text = normalize_whitespace(text)
+    
+    head, tail = text[:-BOILERPLATE_TAIL], text[-BOILERPLATE_TAIL:]
+    for pattern in BOILERPLATE:
+        tail = pattern.sub("", tail).rstrip()
+    return (head + tail).strip()
@@ -0,0 +1,120 @@
+"""
+zkHetz HTTP Client
+One shared, pooled requests session for the collector. Connections to a host
+are kept alive and reused across feeds, so feeds on the same host (feedburner,
+cisa.gov, ...) skip the TCP and TLS handshakes after the first request.
+"""
+
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Pool sizing - number of host pools cached, and idle connections kept per host
+POOL_HOSTS = int(os.getenv("COLLECTOR_POOL_HOSTS", "128"))
+POOL_PER_HOST = int(os.getenv("COLLECTOR_POOL_PER_HOST", "4"))
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "application/rss+xml, application/xml, application/atom+xml, text/xml, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    # gzip/deflate, plus br and zstd when the optional brotli/zstandard packages are installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+# Content types that are never a feed - rejected before the body is downloaded.
+# text/html is allowed: plenty of servers mislabel their RSS.
+REJECTED_CONTENT_TYPES = ("image/", "audio/", "video/", "font/", "application/pdf", "application/zip", "application/json")
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ResponseRejected(Exception):
+    """Raised when a response is not a feed, too large, or too slow to download."""
+
+# Global session (lazy initialized)
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_hosts=POOL_HOSTS, pool_per_host=POOL_PER_HOST):
+    """Create a requests session with per-host keep-alive connection pools."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session():
+    """Get the shared session, creating it if needed (thread-safe)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def read_body(response, max_bytes, max_seconds):
+    """
+    Read a streamed response body (decoded) with a size cap and an overall
+    deadline. Raises ResponseRejected on a non-feed content type, a body over
+    `max_bytes` (checked against Content-Length first), or a slow download.
+    """
+    content_type = response.headers.get("Content-Type", "").lower()
+    if content_type.startswith(REJECTED_CONTENT_TYPES):
+        raise ResponseRejected(f"content type {content_type.split(';')[0]}")
+    
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise ResponseRejected(f"{int(length)} bytes")
+    
+    # read1 returns whatever one recv delivers, so the deadline is checked
+    # even while a server trickles bytes; the watchdog shuts the socket down
+    # when a read blocks past the deadline
+    def shutdown():
+        try:
+            response.raw.shutdown()
+        except (ValueError, RuntimeError, OSError):
+            pass  # Already read or released
+    
+    deadline = time.monotonic() + max_seconds
+    watchdog = threading.Timer(max_seconds, shutdown)
+    watchdog.daemon = True
+    watchdog.start()
+    chunks = []
+    size = 0
+    try:
+        while True:
+            try:
+                chunk = response.raw.read1(CHUNK_SIZE, decode_content=True)
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise ResponseRejected(f"slower than {max_seconds}s")
+                raise
+            if time.monotonic() > deadline:
+                raise ResponseRejected(f"slower than {max_seconds}s")
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise ResponseRejected(f"over {max_bytes} bytes")
+            chunks.append(chunk)
+    finally:
+        watchdog.cancel()
+    return b"".join(chunks)
+
+
+def close_session():
+    """Close pooled connections; the next get_session() starts fresh."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
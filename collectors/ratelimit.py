@@ -0,0 +1,93 @@
+"""
+zkHetz Host Rate Limiting
+Per-host token buckets for politeness, plus Retry-After handling: a 429 (or
+503 with Retry-After) pauses the whole host, so other feeds on it wait
+instead of tripping the limit again. Waits longer than `max_wait` fail fast.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class RateLimited(Exception):
+    """Raised when a host can't be requested within the allowed wait."""
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens/second, holding at most `burst`."""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def reserve(self, max_wait):
+        """Take a token; returns seconds to wait before using it, or raises RateLimited."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(self.paused_until - now, -self.tokens / self.rate if self.tokens < 0 else 0.0)
+            if wait > max_wait:
+                self.tokens += 1
+                raise RateLimited(f"would wait {wait:.0f}s")
+            return wait
+    
+    def pause(self, seconds):
+        """Block the bucket for `seconds` (e.g. after a 429)."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class HostRateLimiter:
+    """One token bucket per host, with per-host overrides."""
+    
+    def __init__(self, limits=None, default=(2.0, 4), max_wait=30.0):
+        """
+        `limits` maps host -> (requests per second, burst);
+        other hosts use `default`.
+        """
+        self.limits = limits or {}
+        self.default = default
+        self.max_wait = max_wait
+        self.buckets = {}
+        self.lock = threading.Lock()
+    
+    def bucket(self, host) -> TokenBucket:
+        with self.lock:
+            if host not in self.buckets:
+                rate, burst = self.limits.get(host, self.default)
+                self.buckets[host] = TokenBucket(rate, burst)
+            return self.buckets[host]
+    
+    def acquire(self, host):
+        """Wait for the host's next request slot (raises RateLimited if too long)."""
+        wait = self.bucket(host).reserve(self.max_wait)
+        if wait > 0:
+            time.sleep(wait)
+    
+    def pause(self, host, seconds):
+        """Pause all requests to a host."""
+        self.bucket(host).pause(seconds)
@@ -1,161 +1,479 @@
 """
 zkHetz RSS Collector
-Collects from all configured RSS sources.
-Deduplication by URL prevents re-adding existing items.
+Collects from all configured RSS sources, fetching feeds concurrently
+(bounded globally and per host).
+Deduplication by URL (local seen-URL index) prevents re-adding existing items.
 """
 
+import multiprocessing
+import os
+import threading
+import time
 import feedparser
 import requests
 import ssl
 import certifi
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
-from config.sources import get_all_sources, get_sources_by_category, SourceCategory
-from utils.db import save_raw_items
+from typing import Optional
+from urllib.parse import urlparse
+from config.sources import (
+    get_all_sources, get_sources_by_category, group_sources_by_url, normalize_url, get_url_host,
+    SourceCategory, RSSSource, HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT
+)
+from collectors.http_client import get_session, close_session, read_body, ResponseRejected
+from collectors.feed_cache import NotModified, load_validators, save_validators, conditional_headers, check_response
+from collectors.watermarks import load_watermarks, save_watermarks, filter_new_entries
+from collectors.seen_index import SeenIndex, filter_unseen
+from collectors.writer import StreamingWriter
+from collectors.archive import FeedRecorder, FeedReplay, new_archive_path
+from collectors.ratelimit import HostRateLimiter, RateLimited, retry_after_seconds
+from collectors.sharding import shard_of, parse_shard, start_shard_output, write_shard_items, read_shard_items, \
+    write_shard_state, read_shard_state
+from collectors.scheduler import load_schedule, save_schedule, is_due, record_poll
+from collectors.feed_parser import parse_entries as fast_parse_entries
+from collectors.html_text import html_to_text, normalize_whitespace
+from collectors.verification import load_verification, is_known_bad
+from collectors.health import load_health, save_health, breaker_state, record_result, OPEN, HALF_OPEN
+from utils.db import save_raw_items, get_raw_item_urls
 
 # Fix SSL for Mac
 ssl._create_default_https_context = lambda: ssl.create_default_context(cafile=certifi.where())
 
 # Settings
 TIMEOUT = 15
-USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+MAX_ENTRIES = 15  # Entries taken from the top of each feed
+
+# Also store the original summary/content HTML as raw_content (needs that column in raw_items)
+KEEP_RAW_HTML = os.getenv("COLLECTOR_KEEP_RAW_HTML", "0") == "1"
+
+# Parser - "fast" (streaming, falls back to feedparser) or "feedparser"
+PARSER = os.getenv("COLLECTOR_PARSER", "fast")
+
+# Parse stage - worker processes (0 = parse in the fetch threads), and how
+# many downloaded bodies may wait for a parser before downloads pause
+PARSE_WORKERS = int(os.getenv("COLLECTOR_PARSE_WORKERS", "0"))
+PARSE_QUEUE_SIZE = int(os.getenv("COLLECTOR_PARSE_QUEUE", "32"))
+
+# Streaming save - flush a batch at this many items, or after this many seconds
+STREAM_BATCH_SIZE = int(os.getenv("COLLECTOR_STREAM_BATCH", "100"))
+STREAM_FLUSH_SECONDS = float(os.getenv("COLLECTOR_STREAM_FLUSH_SECONDS", "5"))
+
+# Concurrency - total feeds in flight, and max simultaneous requests per host
+MAX_WORKERS = int(os.getenv("COLLECTOR_WORKERS", "16"))
+PER_HOST_LIMIT = int(os.getenv("COLLECTOR_PER_HOST", "2"))
+
+# Download limits - a feed over this size, or slower than this overall, is dropped
+MAX_FEED_BYTES = int(os.getenv("COLLECTOR_MAX_FEED_BYTES", str(5 * 1024 * 1024)))
+MAX_FEED_SECONDS = float(os.getenv("COLLECTOR_MAX_FEED_SECONDS", "30"))
+
+# Politeness - longest we wait for a host's rate limit / Retry-After before giving up
+MAX_RATE_WAIT = float(os.getenv("COLLECTOR_MAX_RATE_WAIT", "30"))
+DEFAULT_429_PAUSE = 10  # Seconds to pause a host on a 429 without Retry-After
+
+# Feed result statuses
+STATUS_OK = "ok"
+STATUS_UNCHANGED = "unchanged"
+STATUS_EMPTY = "empty"
+STATUS_FAILED = "failed"
+STATUS_DEFERRED = "deferred"  # Held back by our own rate limiter; not the source's fault
+
+
+@dataclass
+class FeedResult:
+    """Outcome of fetching a single source."""
+    source: RSSSource
+    status: str
+    items: list = field(default_factory=list)
+    validators: Optional[dict] = None  # Stored once the items are saved
+    watermark: Optional[dict] = None   # Stored once the items are saved
+    error: Optional[str] = None        # Error class for the health ledger
+    elapsed: float = 0.0               # Seconds spent fetching and parsing
+    parse_time: float = 0.0            # CPU seconds spent parsing
 
 
 def get_source_type(source) -> str:
-    """Determine source type for dashboard display based on source name/url."""
-    name_lower = source.name.lower()
-    url_lower = source.url.lower()
-    
-    # Government sources
-    if any(x in name_lower for x in ['cisa', 'ncsc', 'cert', 'bsi', 'anssi', 'enisa', 'nist', 'fbi', 'acsc', 'jpcert', 'jvn', 'ipa', 'incd', 'krcert', 'cccs']):
-        return "GOVERNMENT"
-    if any(x in url_lower for x in ['.gov', '.go.jp', '.go.kr', '.gc.ca', 'europa.eu', 'bund.de']):
-        return "GOVERNMENT"
-    
-    # Academic sources
-    if any(x in name_lower for x in ['arxiv', 'ieee', 'acm', 'usenix', 'iacr']):
-        return "ACADEMIC"
-    
-    # Non-profit / Think tanks
-    if any(x in name_lower for x in ['eff', 'epic', 'fido', 'carnegie', 'brookings', 'rand', 'cfr', 'chatham', 'atlantic council', 'csis', 'belfer', 'stimson', 'access now']):
-        return "NON-PROFIT"
-    
-    # Independent security researchers
-    if any(x in name_lower for x in ['krebs', 'schneier', 'troy hunt', 'graham cluley', 'risky business', 'lawfare']):
-        return "INDEPENDENT"
-    
-    # Commercial/vendor sources
-    if any(x in name_lower for x in ['crowdstrike', 'mandiant', 'microsoft', 'google', 'kaspersky', 'sophos', 
-                                      'sentinelone', 'palo alto', 'unit 42', 'cisco', 'talos', 'fortinet', 
-                                      'checkpoint', 'check point', 'trend micro', 'cloudflare', 'aws', 
-                                      'hashicorp', 'proofpoint', 'recorded future', 'eset', 'bitdefender',
-                                      'zscaler', 'dragos', 'volexity', 'red canary', 'binary defense',
-                                      'intezer', 'huntress', 'cybereason', 'flashpoint', 'intel471',
-                                      'sekoia', 'ahnlab', 'thales', 'aware', 'onelogin', 'jumpcloud',
-                                      'curity', 'auth0', 'lac security', 'malwarebytes', 'tenable',
-                                      'qualys', 'elastic', 'sans']):
-        return "COMMERCIAL"
-    
-    # Media sources
-    if any(x in name_lower for x in ['times', 'herald', 'post', 'news', 'bleeping', 'hacker news',
-                                      'dark reading', 'securityweek', 'threatpost', 'infosecurity',
-                                      'sc media', 'register', 'wired', 'ars technica', 'verge',
-                                      'techcrunch', 'mit technology', 'spectrum', 'crunchbase',
-                                      'finsmes', 'alleywatch', 'eu-startups', 'silicon', 'euractiv',
-                                      'politico', 'zdnet', 'bloter', 'daily nk', 'nk news',
-                                      'the record', 'cyberscoop', 'fedscoop', 'nextgov', 'statescoop',
-                                      'meritalk', 'fcw', 'foreign affairs', 'war on the rocks',
-                                      'gdpr today', 'dataguidance', 'privacy laws', 'calcalist',
-                                      'ynet', 'i24', 'israel defense', 'nocamels']):
-        return "MEDIA"
-    
-    return "MEDIA"
-
-
-def fetch_feed_content(url):
-    """Fetch feed content using requests with proper headers."""
-    headers = {
-        "User-Agent": USER_AGENT,
-        "Accept": "application/rss+xml, application/xml, application/atom+xml, text/xml, */*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept-Encoding": "gzip, deflate",
-        "Connection": "keep-alive",
+    """Source type for dashboard display (classified once in config.sources)."""
+    return source.source_type
+
+
+def get_host(url) -> str:
+    """Return the lowercase host of a feed URL."""
+    return urlparse(url).netloc.lower()
+
+
+def fetch_feed_content(url, cached=None, limiter=None, archive=None):
+    """
+    Fetch feed content over the shared pooled session (headers set there).
+    The body is streamed with a size cap and deadline (ResponseRejected
+    otherwise). Sends a conditional GET when `cached` validators are given and raises
+    NotModified if the feed is unchanged. Returns (content, validators).
+    With a `limiter`, waits for the host's rate limit and honors 429/Retry-After
+    (pausing the host and retrying once if the wait is short enough).
+    `archive` is a FeedRecorder (downloaded bodies are stored) or a
+    FeedReplay (responses come from the archive, not the network).
+    """
+    if archive is not None and archive.replaying:
+        response = archive.response(url)
+        return response.content, check_response(response, cached, response.content)
+    
+    headers = conditional_headers(cached)
+    host = get_host(url)
+    
+    for attempt in range(2):
+        if limiter is not None:
+            limiter.acquire(host)
+        response = get_session().get(url, headers=headers, timeout=TIMEOUT, verify=True, stream=True)
+        
+        retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+        rate_limited = response.status_code == 429 or (response.status_code == 503 and retry_after is not None)
+        if limiter is None or not rate_limited:
+            break
+        response.close()
+        limiter.pause(host, retry_after if retry_after is not None else DEFAULT_429_PAUSE)
+    
+    with response:
+        response.raise_for_status()
+        content = b"" if response.status_code == 304 else read_body(response, MAX_FEED_BYTES, MAX_FEED_SECONDS)
+        if archive is not None and response.status_code != 304:
+            archive.record(url, response, content)
+        validators = check_response(response, cached, content)
+    return content, validators
+
+
+def log_feed_status(name, status):
+    """Print one complete status line per feed (safe with concurrent fetches)."""
+    print(f"  Fetching: {name}... {status}\n", end="", flush=True)
+
+
+def entry_published(entry):
+    """Published (or updated) date of a feed entry as an ISO string, or None."""
+    published = None
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        try:
+            published = datetime(*entry.published_parsed[:6]).isoformat()
+        except:
+            pass
+    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+        try:
+            published = datetime(*entry.updated_parsed[:6]).isoformat()
+        except:
+            pass
+    return published
+
+
+def entry_to_item(entry) -> dict:
+    """Extract the source-independent fields of a feed entry (content as plain text)."""
+    published = entry_published(entry)
+    
+    content = entry.get("summary", "") or entry.get("description", "")
+    if hasattr(entry, 'content') and entry.content:
+        content = entry.content[0].get('value', content)
+    
+    item = {
+        "title": normalize_whitespace(entry.get("title", "") or "No title")[:500],
+        "content": html_to_text(content)[:5000],
+        "url": entry.get("link", ""),
+        "published_at": published,
     }
+    if KEEP_RAW_HTML:
+        item["raw_content"] = content[:20000]
+    return item
+
+
+def parse_feed(content, url, allow_fallback=True, parser=PARSER, limit=MAX_ENTRIES):
+    """
+    Parse the first `limit` entries of a feed.
+    Tries the fast streaming parser, then feedparser on the fetched body, then
+    (if `allow_fallback`) feedparser fetching the URL itself.
+    Returns a list of entries ([] if the feed is empty), or None on a parse error.
+    """
+    if parser == "fast":
+        entries = fast_parse_entries(content, limit)
+        if entries is not None:
+            return entries
     
-    response = requests.get(url, headers=headers, timeout=TIMEOUT, verify=True)
-    response.raise_for_status()
-    return response.content
+    feed = feedparser.parse(content)
+    if feed.bozo and not feed.entries:
+        # Try direct feedparser as fallback
+        if allow_fallback:
+            feed = feedparser.parse(url)
+        if feed.bozo and not feed.entries:
+            return None
+    return feed.entries[:limit]
+
+
+def feed_label(sources) -> str:
+    """Display name of a feed group."""
+    if len(sources) == 1:
+        return sources[0].name
+    return f"{sources[0].name} (+{len(sources) - 1} shared)"
+
+
+def make_results(sources, status, elapsed, items_by_source=None, validators=None, watermark=None, error=None,
+                 parse_time=0.0):
+    """One FeedResult per source of a feed group; `items_by_source` is indexed by position."""
+    items_by_source = items_by_source or [[] for _ in sources]
+    return [FeedResult(s, status, items, validators, watermark, error, elapsed, parse_time)
+            for s, items in zip(sources, items_by_source)]
 
 
-def fetch_single_feed(source):
-    """Fetch items from a single RSS feed."""
-    print(f"  Fetching: {source.name}...", end=" ", flush=True)
+def download_feed_group(sources, cached=None, limiter=None, archive=None):
+    """
+    Network stage for one feed URL.
+    Returns (content, validators, elapsed), or a list of FeedResults
+    if the feed is unchanged or the download failed.
+    """
+    name = feed_label(sources)
+    started = time.monotonic()
     
     try:
         # Fetch with requests first (better headers)
-        content = fetch_feed_content(source.url)
-        feed = feedparser.parse(content)
+        content, validators = fetch_feed_content(sources[0].url, cached, limiter, archive)
+        return content, validators, time.monotonic() - started
+    except NotModified:
+        log_feed_status(name, "NOT MODIFIED")
+        return make_results(sources, STATUS_UNCHANGED, time.monotonic() - started)
+    except RateLimited:
+        log_feed_status(name, "RATE LIMITED (deferred)")
+        return make_results(sources, STATUS_DEFERRED, time.monotonic() - started)
+    except ResponseRejected as e:
+        log_feed_status(name, f"REJECTED ({e})")
+        return make_results(sources, STATUS_FAILED, time.monotonic() - started, error="Rejected")
+    except requests.exceptions.Timeout:
+        log_feed_status(name, "TIMEOUT")
+        return make_results(sources, STATUS_FAILED, time.monotonic() - started, error="Timeout")
+    except requests.exceptions.HTTPError as e:
+        log_feed_status(name, f"HTTP {e.response.status_code}")
+        return make_results(sources, STATUS_FAILED, time.monotonic() - started,
+                            error=f"HTTP {e.response.status_code}")
+    except Exception as e:
+        log_feed_status(name, f"FAIL ({type(e).__name__})")
+        return make_results(sources, STATUS_FAILED, time.monotonic() - started, error=type(e).__name__)
+
+
+def parse_feed_group(sources, content, validators=None, mark=None, allow_fallback=True, parser=PARSER,
+                     fetch_elapsed=0.0):
+    """
+    CPU stage for one feed URL: parse the body and build items for every
+    source (category listing) that references it. Runs in-thread or in a
+    worker process, so it only takes and returns picklable values.
+    """
+    name = feed_label(sources)
+    started = time.monotonic()
+    cpu_started = time.thread_time()
+    
+    def results(status, items_by_source=None, watermark=None, error=None):
+        elapsed = fetch_elapsed + time.monotonic() - started
+        # A feed that failed to parse keeps its old validators, so it is downloaded again
+        feed_validators = validators if status != STATUS_FAILED else None
+        return make_results(sources, status, elapsed, items_by_source, feed_validators, watermark, error,
+                            time.thread_time() - cpu_started)
+    
+    try:
+        entries = parse_feed(content, sources[0].url, allow_fallback, parser)
         
-        if feed.bozo and not feed.entries:
-            # Try direct feedparser as fallback
-            feed = feedparser.parse(source.url)
-            if feed.bozo and not feed.entries:
-                print(f"FAIL (parse error)")
-                return []
+        if entries is None:
+            log_feed_status(name, "FAIL (parse error)")
+            return results(STATUS_FAILED, error="ParseError")
         
-        if not feed.entries:
-            print(f"EMPTY")
-            return []
+        if not entries:
+            log_feed_status(name, "EMPTY")
+            return results(STATUS_EMPTY)
+        
+        # Skip entries collected on earlier runs before building items
+        new_entries, watermark = filter_new_entries(entries, mark, entry_published)
+        if not new_entries:
+            log_feed_status(name, "NO NEW ITEMS")
+            return results(STATUS_UNCHANGED, watermark=watermark)
         
-        items = []
-        source_type = get_source_type(source)
+        entries = [entry_to_item(entry) for entry in new_entries]
+        collected_at = datetime.now().isoformat()
         
-        for entry in feed.entries[:15]:
-            
-            published = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                try:
-                    published = datetime(*entry.published_parsed[:6]).isoformat()
-                except:
-                    pass
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                try:
-                    published = datetime(*entry.updated_parsed[:6]).isoformat()
-                except:
-                    pass
-            
-            content = entry.get("summary", "") or entry.get("description", "")
-            if hasattr(entry, 'content') and entry.content:
-                content = entry.content[0].get('value', content)
-            
-            items.append({
-                "title": entry.get("title", "No title")[:500],
-                "content": content[:5000],
-                "url": entry.get("link", ""),
-                "source_name": source.name,
+        items_by_source = []
+        for s in sources:
+            source_type = get_source_type(s)
+            items_by_source.append([{
+                **entry,
+                "source_name": s.name,
                 "source_type": source_type,
-                "category": source.category.value,
-                "published_at": published,
-                "collected_at": datetime.now().isoformat()
-            })
+                "category": s.category.value,
+                "collected_at": collected_at,
+            } for entry in entries])
         
-        print(f"OK ({len(items)} items)")
-        return items
+        log_feed_status(name, f"OK ({len(entries)} items)")
+        return results(STATUS_OK, items_by_source, watermark)
     
-    except requests.exceptions.Timeout:
-        print(f"TIMEOUT")
-        return []
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP {e.response.status_code}")
-        return []
     except Exception as e:
-        print(f"FAIL ({type(e).__name__})")
-        return []
+        log_feed_status(name, f"FAIL ({type(e).__name__})")
+        return results(STATUS_FAILED, error=type(e).__name__)
+
+
+def fetch_feed_group(sources, cached=None, mark=None, allow_fallback=True, parser=PARSER, archive=None):
+    """
+    Fetch and parse one feed URL once, then emit items for every source
+    (category listing) that references it. Returns one FeedResult per source.
+    `cached` holds HTTP validators and `mark` the feed's watermark.
+    `allow_fallback` permits a second fetch through feedparser on parse errors
+    (never when replaying from an `archive`).
+    """
+    if archive is not None and archive.replaying:
+        allow_fallback = False
+    downloaded = download_feed_group(sources, cached, archive=archive)
+    if isinstance(downloaded, list):
+        return downloaded
+    content, validators, elapsed = downloaded
+    return parse_feed_group(sources, content, validators, mark, allow_fallback, parser, elapsed)
+
+
+def fetch_single_feed(source, cached=None, archive=None):
+    """Fetch items from a single RSS feed (or from a FeedRecorder/FeedReplay `archive`)."""
+    return fetch_feed_group([source], cached, archive=archive)[0]
+
+
+def commit_feed_state(validators, watermarks, tags):
+    """Store the (key, validators, watermark) tags of feeds whose items are saved."""
+    for key, feed_validators, watermark in tags:
+        if feed_validators:
+            validators[key] = feed_validators
+        if watermark:
+            watermarks[key] = watermark
+    save_validators(validators)
+    save_watermarks(watermarks)
+
 
+def commit_feed_health(health, outcomes, now):
+    """Record the (key, ok, elapsed, error) fetch outcomes in the health ledger."""
+    for key, ok, elapsed, error in outcomes:
+        record_result(health, key, ok, elapsed, error, now)
+    save_health(health)
 
-def collect_all_feeds(category_filter=None, priority_filter=None):
-    """Collect from all configured feeds."""
+
+def commit_feed_polls(schedule, polls, now):
+    """Record the (key, published) polls of feeds whose items are saved in the schedule."""
+    for key, published in polls:
+        record_poll(schedule, key, published, now)
+    save_schedule(schedule)
+
+
+def load_seen_index(rebuild=False):
+    """Load the local seen-URL index, rebuilding it from raw_items if needed."""
+    index = None if rebuild else SeenIndex.load()
+    if index is None:
+        print("Rebuilding seen-URL index from raw_items...")
+        try:
+            index = SeenIndex.from_urls(get_raw_item_urls())
+        except Exception as e:
+            print(f"  Could not rebuild index ({type(e).__name__}), relying on database dedup")
+            return None
+        index.save()
+        print(f"  Indexed {len(index)} URLs")
+    return index
+
+
+def interleave_by_host(groups):
+    """Order feed groups round-robin by host so one busy host doesn't hold every worker."""
+    by_host = {}
+    for group in groups:
+        by_host.setdefault(get_host(group[0].url), []).append(group)
     
-    if category_filter:
+    ordered = []
+    queues = list(by_host.values())
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop(0))
+        queues = [q for q in queues if q]
+    return ordered
+
+
+def fetch_all_concurrently(groups, fetch, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT):
+    """
+    Run `fetch(group)` for every feed group on a bounded thread pool.
+    - At most `workers` feeds in flight overall
+    - At most `per_host` requests in flight against the same host
+    Returns a list of FeedResult lists in the same order as `groups`.
+    """
+    host_limits = {}
+    for group in groups:
+        host = get_host(group[0].url)
+        if host not in host_limits:
+            host_limits[host] = threading.BoundedSemaphore(max(per_host, 1))
+    
+    def fetch_with_host_limit(group):
+        with host_limits[get_host(group[0].url)]:
+            return fetch(group)
+    
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {id(group): executor.submit(fetch_with_host_limit, group)
+                   for group in interleave_by_host(groups)}
+        return [futures[id(group)].result() for group in groups]
+
+
+def fetch_all_pipelined(groups, download, parse_args, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT,
+                        parse_workers=PARSE_WORKERS, queue_size=PARSE_QUEUE_SIZE, on_done=None):
+    """
+    Two-stage pipeline: fetch threads download feeds and hand the bodies to a
+    process pool that parses them on all cores. A bounded number of bodies
+    wait for parsing; when the queue is full, downloads pause.
+    `download(group)` is download_feed_group with the group's state bound,
+    `parse_args(group)` returns the extra parse_feed_group arguments.
+    `on_done(results)` is called as each group finishes, if given.
+    Returns a list of FeedResult lists in the same order as `groups`.
+    """
+    queue_slots = threading.BoundedSemaphore(max(queue_size, 1))
+    
+    def parsed(future):
+        queue_slots.release()
+        if on_done and not future.exception():
+            on_done(future.result())
+    
+    # Workers are started from fetch threads that may hold locks (stdout, connection
+    # pools), so they are spawned fresh rather than forked from this process
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        def fetch_stage(group):
+            downloaded = download(group)
+            if isinstance(downloaded, list):
+                if on_done:
+                    on_done(downloaded)
+                return downloaded
+            content, validators, elapsed = downloaded
+            queue_slots.acquire()
+            future = pool.submit(parse_feed_group, group, content, validators, *parse_args(group),
+                                 fetch_elapsed=elapsed)
+            future.add_done_callback(parsed)
+            return future
+        
+        staged = fetch_all_concurrently(groups, fetch_stage, workers=workers, per_host=per_host)
+        return [r.result() if isinstance(r, Future) else r for r in staged]
+
+
+def collect_all_feeds(category_filter=None, priority_filter=None, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT,
+                      use_cache=True, rebuild_index=False, full_sweep=False, parser=PARSER,
+                      parse_workers=PARSE_WORKERS, stream=False, shard=None, output=None, record=False,
+                      replay=None, sources=None, on_results=None):
+    """
+    Collect from all configured feeds.
+    With `stream`, items are saved in batches by a background writer while
+    fetching continues, and are not kept in memory (returns an empty list).
+    `shard` = (i, N) collects only the feed hosts hashed to shard i.
+    `output` writes items to a shard file (see merge_shard_outputs) instead
+    of the database. Nothing is added to the seen-URL index, and the feeds'
+    validators, watermarks, health outcomes and polls are written next to
+    the file for the merge to commit, so a shard that is never merged is
+    collected again (and concurrent shards don't overwrite each other's state).
+    `record` stores every downloaded feed body in a new archive file (feeds
+    are fetched without conditional headers, so the archive holds them all);
+    `replay` (an archive path) serves feeds from that file instead of the
+    network. Replays ignore and leave untouched all collector state, and only
+    save items when `output` is given.
+    `sources` replaces the configured source list (e.g. for benchmarks) and
+    `on_results(results)` receives every source's FeedResult after the run.
+    """
+    
+    if sources is not None:
+        sources = list(sources)
+    elif category_filter:
         try:
             cat = SourceCategory(category_filter)
             sources = get_sources_by_category(cat)
@@ -171,46 +489,303 @@ def collect_all_feeds(category_filter=None, priority_filter=None):
     print("=" * 60)
     print("zkHetz RSS Collector")
     print("=" * 60)
-    print(f"Sources: {len(sources)} | Timeout: {TIMEOUT}s")
+    print(f"Sources: {len(sources)} | Timeout: {TIMEOUT}s | Workers: {workers} ({per_host}/host)")
     if category_filter:
         print(f"Category: {category_filter}")
+    
+    archive = None
+    if replay:
+        archive = FeedReplay(replay)
+        use_cache = False
+        full_sweep = True
+        print(f"Replaying {len(archive)} archived responses from {replay}")
+    elif record:
+        archive = FeedRecorder(new_archive_path())
+        print(f"Recording responses to {archive.path}")
+    
+    save_items = save_raw_items
+    if output:
+        start_shard_output(output)
+        save_items = lambda items: write_shard_items(output, items)
+    
+    validators = load_validators()
+    watermarks = load_watermarks()
+    schedule = load_schedule()
+    health = load_health()
+    now = datetime.utcnow()
+    
+    # Each unique URL is fetched once and fanned out to every listing
+    groups = group_sources_by_url(sources)
+    if shard:
+        shard_index, shard_count = shard
+        groups = [g for g in groups if shard_of(get_url_host(g[0].url), shard_count) == shard_index]
+        sources = [s for g in groups for s in g]
+        print(f"Shard: {shard_index}/{shard_count} ({len(sources)} sources)")
+    if not full_sweep:
+        due_groups = [g for g in groups if is_due(schedule.get(normalize_url(g[0].url)), now)]
+        not_due_count = sum(len(g) for g in groups) - sum(len(g) for g in due_groups)
+        groups = due_groups
+        print(f"Schedule: {not_due_count} sources not due this run (--full-sweep to poll all)")
+    else:
+        not_due_count = 0
+    
+    # Circuit breaker - skip failing feeds while backing off, probe once after
+    breaker = {normalize_url(g[0].url): breaker_state(health.get(normalize_url(g[0].url)), now) for g in groups}
+    if not full_sweep:
+        open_groups = [g for g in groups if breaker[normalize_url(g[0].url)] == OPEN]
+        groups = [g for g in groups if breaker[normalize_url(g[0].url)] != OPEN]
+        breaker_count = sum(len(g) for g in open_groups)
+        print(f"Circuit breaker: {breaker_count} failing sources skipped while backing off")
+    else:
+        breaker_count = 0
+    
+    # Feeds the last verification run found broken (python -m collectors.verify_sources)
+    verification = load_verification()
+    if not full_sweep and verification:
+        bad_groups = [g for g in groups if is_known_bad(verification.get(normalize_url(g[0].url)), now)]
+        groups = [g for g in groups if not is_known_bad(verification.get(normalize_url(g[0].url)), now)]
+        known_bad_count = sum(len(g) for g in bad_groups)
+        print(f"Verification: {known_bad_count} known-bad sources skipped")
+    else:
+        known_bad_count = 0
     print("=" * 60 + "\n")
     
+    def parse_args(group):
+        """(mark, allow_fallback, parser) for parse_feed_group."""
+        key = normalize_url(group[0].url)
+        # Probes and known-bad feeds don't get a second (fallback) fetch
+        allow_fallback = breaker[key] != HALF_OPEN and health.get(key, {}).get("consecutive_failures", 0) == 0
+        allow_fallback = allow_fallback and not replay
+        return (watermarks.get(key) if use_cache else None), allow_fallback, parser
+    
+    limiter = HostRateLimiter(HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT, max_wait=MAX_RATE_WAIT)
+    
+    def download(group):
+        # A recording run needs every body, so it never asks for a 304
+        cached = validators.get(normalize_url(group[0].url)) if use_cache and not record else None
+        return download_feed_group(group, cached, limiter, archive)
+    
+    shard_state = []
+    
+    def remember_state(tags):
+        """Commit validators and watermarks of feeds whose items are stored."""
+        if replay:
+            return
+        if output:
+            # Items only reach the database on merge, which commits these then
+            shard_state.extend(tags)
+            return
+        commit_feed_state(validators, watermarks, tags)
+    
+    writer = None
+    published_by_key = {}
+    if stream and not (replay and not output):
+        seen = None if replay or output else load_seen_index(rebuild=rebuild_index)
+        writer = StreamingWriter(save_items, batch_size=STREAM_BATCH_SIZE, flush_seconds=STREAM_FLUSH_SECONDS,
+                                 seen=seen, on_saved=remember_state).start()
+    
+    def emit(results):
+        """Hand a finished feed's items to the writer and drop them from memory."""
+        if writer is None:
+            return
+        first = results[0]
+        key = normalize_url(first.source.url)
+        published_by_key[key] = [item["published_at"] for item in first.items]
+        items = [item for r in results if r.status == STATUS_OK for item in r.items]
+        writer.put(items, (key, first.validators, first.watermark))
+        for r in results:
+            r.items = []
+    
+    def fetch(group):
+        downloaded = download(group)
+        if isinstance(downloaded, list):
+            emit(downloaded)
+            return downloaded
+        content, cached, elapsed = downloaded
+        results = parse_feed_group(group, content, cached, *parse_args(group), fetch_elapsed=elapsed)
+        emit(results)
+        return results
+    
     all_items = []
     success_count = 0
+    unchanged_count = 0
     fail_count = 0
+    deferred_count = 0
+    
+    if parse_workers > 0:
+        group_results = fetch_all_pipelined(groups, download, parse_args, workers=workers, per_host=per_host,
+                                            parse_workers=parse_workers, on_done=emit)
+    elif workers > 1:
+        group_results = fetch_all_concurrently(groups, fetch, workers=workers, per_host=per_host)
+    else:
+        group_results = [fetch(group) for group in groups]
+    close_session()
+    if writer is not None:
+        writer.close()
+    if archive is not None:
+        archive.close()
+    
+    # Feeds whose streamed batch failed to save: not polled, and not counted as healthy
+    unsaved_keys = {tag[0] for tag in writer.failed_tags} if writer is not None else set()
+    
+    outcomes = []
+    for group in group_results:
+        result = group[0]
+        if result.status == STATUS_DEFERRED or normalize_url(result.source.url) in unsaved_keys:
+            continue
+        outcomes.append((normalize_url(result.source.url), result.status != STATUS_FAILED,
+                         result.elapsed, result.error))
+    if not replay and not output:
+        commit_feed_health(health, outcomes, now)
+    
+    # Results come back per group in source order (possibly as copies from a worker process)
+    by_source = {id(s): r for group, rs in zip(groups, group_results) for s, r in zip(group, rs)}
+    results = [by_source[id(source)] for source in sources if id(source) in by_source]
+    
+    if on_results:
+        on_results(results)
     
-    for source in sources:
-        items = fetch_single_feed(source)
-        if items:
-            all_items.extend(items)
+    for result in results:
+        if result.status == STATUS_OK:
+            all_items.extend(result.items)
             success_count += 1
+        elif result.status == STATUS_UNCHANGED:
+            unchanged_count += 1
+        elif result.status == STATUS_DEFERRED:
+            deferred_count += 1
         else:
             fail_count += 1
     
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    print(f"OK: {success_count} | Failed: {fail_count} | Items: {len(all_items)}")
+    item_count = writer.received if writer is not None else len(all_items)
+    print(f"OK: {success_count} | Unchanged: {unchanged_count} | Failed: {fail_count} | "
+          f"Deferred: {deferred_count} | Not due: {not_due_count} | Circuit open: {breaker_count} | "
+          f"Known bad: {known_bad_count} | Items: {item_count}")
     
-    if all_items:
-        saved = save_raw_items(all_items)
-        print(f"Saved to database: {saved} (new items, duplicates skipped)")
+    if writer is not None:
+        if writer.skipped:
+            print(f"Skipped {writer.skipped} already-seen URLs")
+        print(f"Saved to {output or 'database'}: {writer.saved} (new items, duplicates skipped)")
+        if writer.failed_batches:
+            print(f"Failed batches: {writer.failed_batches} (those feeds will be collected again)")
+    elif replay and not output:
+        print("Replay: items not saved (use --output to write them to a file)")
+    elif all_items:
+        seen = None if replay or output else load_seen_index(rebuild=rebuild_index)
+        new_items = filter_unseen(all_items, seen) if seen is not None else all_items
+        if len(new_items) < len(all_items):
+            print(f"Skipped {len(all_items) - len(new_items)} already-seen URLs")
+        if new_items:
+            saved = save_items(new_items)
+            print(f"Saved to {output or 'database'}: {saved} (new items, duplicates skipped)")
+            if seen is not None:
+                seen.add_urls(item["url"] for item in new_items)
+                seen.save()
+    
+    # Only remember validators and watermarks once the items are safely
+    # stored, otherwise a failed save would be skipped on the next run
+    # (the streaming writer does this per batch)
+    if writer is None:
+        remember_state([(normalize_url(r.source.url), r.validators, r.watermark) for r in results])
     
+    polls = []
+    for group in group_results:
+        # A failed, deferred or unsaved feed stays due, so it is retried next run
+        key = normalize_url(group[0].source.url)
+        if group[0].status in (STATUS_FAILED, STATUS_DEFERRED) or key in unsaved_keys:
+            continue
+        published = published_by_key.get(key) or [item["published_at"] for item in group[0].items]
+        polls.append((key, published))
+    if output and not replay:
+        write_shard_state(output, now, shard_state, outcomes, polls)
+    elif not replay:
+        commit_feed_polls(schedule, polls, now)
+    
+    if archive is not None and not replay:
+        print(f"Archived {archive.count} responses to {archive.path}")
     print("=" * 60)
     
     return all_items
 
 
+def merge_shard_outputs(paths, rebuild_index=False):
+    """
+    Combine shard output files, drop already-seen URLs and save to the
+    database, then commit the shards' feed validators, watermarks, health
+    outcomes and polls. Run it with the same state dir as the shard runs.
+    """
+    print("=" * 60)
+    print(f"Merging {len(paths)} shard outputs")
+    print("=" * 60)
+    
+    items = list(read_shard_items(paths))
+    states = read_shard_state(paths)
+    seen = load_seen_index(rebuild=rebuild_index)
+    new_items = filter_unseen(items, seen) if seen is not None else items
+    print(f"Items: {len(items)} | New: {len(new_items)}")
+    
+    if new_items:
+        saved = save_raw_items(new_items)
+        print(f"Saved to database: {saved} (new items, duplicates skipped)")
+        if seen is not None:
+            seen.add_urls(item["url"] for item in new_items)
+            seen.save()
+    
+    # Only once the items are stored, as in a direct run
+    if states:
+        health, schedule = load_health(), load_schedule()
+        tags = [tag for state in states for tag in state["feeds"]]
+        commit_feed_state(load_validators(), load_watermarks(), tags)
+        for state in states:
+            commit_feed_health(health, state["outcomes"], state["now"])
+            commit_feed_polls(schedule, state["polls"], state["now"])
+        print(f"Committed state of {sum(len(state['outcomes']) for state in states)} feeds "
+              f"from {len(states)} shards")
+    print("=" * 60)
+    return new_items
+
+
 if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="zkHetz RSS Collector")
     parser.add_argument("--category", "-c", type=str, help="Collect specific category only")
     parser.add_argument("--priority", "-p", type=int, help="Collect priority <= N only")
+    parser.add_argument("--workers", "-w", type=int, default=MAX_WORKERS, help="Feeds fetched in parallel (1 = serial)")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT, help="Max parallel requests per host")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore stored validators and watermarks, refetch everything")
+    parser.add_argument("--rebuild-index", action="store_true", help="Rebuild the seen-URL index from raw_items")
+    parser.add_argument("--parser", choices=["fast", "feedparser"], default=PARSER, help="Feed parser to use")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Parse in N worker processes (0 = in the fetch threads)")
+    parser.add_argument("--stream", action="store_true", help="Save items in batches while fetching continues")
+    parser.add_argument("--shard", type=str, help="Collect only shard i of N (i/N, 0-based), split by feed host")
+    parser.add_argument("--output", "-o", type=str, help="Write items to a gzip JSONL shard file instead of the database")
+    parser.add_argument("--merge", nargs="+", metavar="FILE", help="Merge shard output files and save to the database")
+    parser.add_argument("--record", action="store_true", help="Archive every downloaded feed body for later replay")
+    parser.add_argument("--replay", type=str, metavar="FILE", help="Serve feeds from a recorded archive instead of the network")
+    parser.add_argument("--full-sweep", action="store_true", help="Poll every source, ignoring the schedule and circuit breaker")
     args = parser.parse_args()
     
+    if args.merge:
+        merge_shard_outputs(args.merge, rebuild_index=args.rebuild_index)
+        raise SystemExit(0)
+    
     collect_all_feeds(
         category_filter=args.category,
-        priority_filter=args.priority
+        priority_filter=args.priority,
+        workers=args.workers,
+        per_host=args.per_host,
+        use_cache=not args.no_cache,
+        rebuild_index=args.rebuild_index,
+        full_sweep=args.full_sweep,
+        parser=args.parser,
+        parse_workers=args.parse_workers,
+        stream=args.stream,
+        shard=parse_shard(args.shard) if args.shard else None,
+        output=args.output,
+        record=args.record,
+        replay=args.replay
     )
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+zkHetz Adaptive Polling Scheduler
+Learns each feed's publish interval from past published_at values and
+decides per run which feeds are due. A feed is never skipped for so long
+that an item published right after a poll would be older than the
+processor's freshness window when it is collected, so slow feeds are only
+skipped when the collector runs more often than that window (with the
+daily workflow, every feed is polled every run). A full sweep ignores the
+schedule.
+"""
+
+import os
+from datetime import datetime
+from statistics import median
+from collectors.state import load_state, save_state
+
+SCHEDULE_FILE = "schedule.json"
+
+MAX_PUBLISH_HISTORY = 30  # Publish dates remembered per feed
+MIN_SAMPLES = 3           # Below this, the feed is polled every run
+POLL_FRACTION = 0.5       # Poll twice per typical publish interval
+MAX_POLL_HOURS = 7 * 24   # Never wait longer than a week
+SLACK_HOURS = 2           # Tolerance for cron start jitter
+
+# Freshness - the processor counts items up to FRESH_WINDOW_HOURS old as fresh
+# (utils.db.get_freshness_hours on weekdays), and the collector runs every
+# RUN_INTERVAL_HOURS (daily cron in .github/workflows/daily-collection.yml)
+FRESH_WINDOW_HOURS = 24
+RUN_INTERVAL_HOURS = float(os.getenv("COLLECTOR_RUN_INTERVAL_HOURS", "24"))
+MAX_SKIP_HOURS = max(0.0, FRESH_WINDOW_HOURS - RUN_INTERVAL_HOURS - SLACK_HOURS)
+
+
+def load_schedule() -> dict:
+    """Load {feed_url: {"published": [iso], "last_polled": iso}} from the state dir."""
+    return load_state(SCHEDULE_FILE)
+
+
+def save_schedule(schedule):
+    """Persist the schedule for the next run."""
+    save_state(SCHEDULE_FILE, schedule)
+
+
+def publish_interval_hours(published):
+    """Median gap between consecutive publish dates, or None if too few."""
+    dates = sorted({datetime.fromisoformat(p) for p in published})
+    if len(dates) < MIN_SAMPLES:
+        return None
+    gaps = [(b - a).total_seconds() / 3600 for a, b in zip(dates, dates[1:])]
+    return median(gaps)
+
+
+def poll_interval_hours(entry) -> float:
+    """How long to wait between polls of a feed (0 = every run), capped so new items are still fresh."""
+    interval = publish_interval_hours(entry.get("published", []))
+    if interval is None:
+        return 0
+    return min(interval * POLL_FRACTION, MAX_POLL_HOURS, MAX_SKIP_HOURS)
+
+
+def is_due(entry, now) -> bool:
+    """Whether a feed should be polled on this run."""
+    if not entry or not entry.get("last_polled"):
+        return True
+    elapsed = (now - datetime.fromisoformat(entry["last_polled"])).total_seconds() / 3600
+    return elapsed + SLACK_HOURS >= poll_interval_hours(entry)
+
+
+def record_poll(schedule, key, published, now):
+    """Record a poll of a feed and the publish dates of any new items."""
+    entry = schedule.setdefault(key, {"published": []})
+    history = sorted(set(entry.get("published", []) + [p for p in published if p]))
+    entry["published"] = history[-MAX_PUBLISH_HISTORY:]
+    entry["last_polled"] = now.isoformat()
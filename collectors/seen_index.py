@@ -0,0 +1,83 @@
+"""
+zkHetz Seen-URL Index
+Compact local index of item URLs already stored in raw_items, kept as a
+sorted array of 64-bit URL hashes (8 bytes per URL). The collector drops
+known URLs before building the insert batch, so only new URLs reach the
+database. Rebuilt from raw_items when missing.
+"""
+
+import hashlib
+import os
+from array import array
+from bisect import bisect_left
+from collectors.state import STATE_DIR, state_path
+
+INDEX_FILE = "seen_urls.bin"
+
+
+def url_hash(url) -> int:
+    """64-bit hash of an item URL."""
+    digest = hashlib.blake2b(url.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SeenIndex:
+    """Sorted array of URL hashes with binary-search membership."""
+    
+    def __init__(self, hashes=()):
+        self.hashes = array("Q", sorted(set(hashes)))
+    
+    def __len__(self):
+        return len(self.hashes)
+    
+    def __contains__(self, url):
+        h = url_hash(url)
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+    
+    def add_urls(self, urls):
+        """Merge new URLs into the index."""
+        new_hashes = {url_hash(url) for url in urls if url}
+        if new_hashes:
+            self.hashes = array("Q", sorted(new_hashes.union(self.hashes)))
+    
+    def save(self):
+        """Write the index atomically to the state dir."""
+        os.makedirs(STATE_DIR, exist_ok=True)
+        path = state_path(INDEX_FILE)
+        with open(path + ".tmp", "wb") as f:
+            self.hashes.tofile(f)
+        os.replace(path + ".tmp", path)
+    
+    @classmethod
+    def load(cls):
+        """Load the index from the state dir, or None if it doesn't exist."""
+        path = state_path(INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        index = cls()
+        with open(path, "rb") as f:
+            index.hashes.frombytes(f.read())
+        return index
+    
+    @classmethod
+    def from_urls(cls, urls):
+        """Build an index from a list of URLs."""
+        return cls(url_hash(url) for url in urls if url)
+
+
+def filter_unseen(items, index):
+    """
+    Keep only items whose URL is not in the index, also dropping repeats
+    within the batch (first listing wins). Items without a URL pass through.
+    """
+    new_items = []
+    batch_urls = set()
+    for item in items:
+        url = (item.get("url") or "").strip()
+        if url:
+            if url in batch_urls or url in index:
+                continue
+            batch_urls.add(url)
+        new_items.append(item)
+    return new_items
@@ -0,0 +1,88 @@
+"""
+zkHetz Collector Sharding
+Deterministic split of sources across collector jobs by a hash of the feed
+host, so every feed on a host lands in the same shard and per-host limits
+still hold. Shards write their items to gzip JSONL files; a merge step
+combines them before saving to the database. Each shard also writes the
+validators, watermarks, health outcomes and polls of its feeds next to its
+items, which the merge commits only once the items are stored, so shards
+never write shared state files themselves.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+
+
+def parse_shard(spec):
+    """Parse 'i/N' (0 <= i < N) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected i/N")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{spec}', need 0 <= i < N")
+    return index, count
+
+
+def shard_of(host, count) -> int:
+    """Shard a host belongs to (stable across processes and machines)."""
+    digest = hashlib.sha1(host.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def shard_state_path(path) -> str:
+    """Path of the feed state file written next to a shard output file."""
+    return path + ".state.json"
+
+
+def start_shard_output(path):
+    """Create (or truncate) a shard output file, so empty shards still produce one."""
+    with gzip.open(path, "wt", encoding="utf-8"):
+        pass
+    if os.path.exists(shard_state_path(path)):
+        os.remove(shard_state_path(path))
+
+
+def write_shard_items(path, items) -> int:
+    """Append items to a shard output file; returns the number written."""
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    return len(items)
+
+
+def read_shard_items(paths):
+    """Yield items from shard output files, in file order."""
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_shard_state(path, now, feeds, outcomes, polls):
+    """
+    Write a shard's feed state next to its output: the run time, the
+    (key, validators, watermark) tags of its feeds, the (key, ok, elapsed,
+    error) fetch outcomes and the (key, published) polls.
+    """
+    state = {"now": now.isoformat(), "feeds": feeds, "outcomes": outcomes, "polls": polls}
+    with open(shard_state_path(path), "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+
+
+def read_shard_state(paths) -> list:
+    """Feed state of every shard output that has a state file (see write_shard_state)."""
+    states = []
+    for path in paths:
+        if os.path.exists(shard_state_path(path)):
+            with open(shard_state_path(path), "r", encoding="utf-8") as f:
+                state = json.load(f)
+            state["now"] = datetime.fromisoformat(state["now"])
+            for field in ("feeds", "outcomes", "polls"):
+                state[field] = [tuple(entry) for entry in state.get(field, [])]
+            states.append(state)
+    return states
@@ -0,0 +1,42 @@
+"""
+zkHetz Collector State
+Small JSON documents the collector keeps between runs (validators,
+watermarks, etc). Stored under COLLECTOR_STATE_DIR, default .collector_state/
+"""
+
+import json
+import os
+import tempfile
+
+STATE_DIR = os.getenv("COLLECTOR_STATE_DIR", ".collector_state")
+
+
+def state_path(name) -> str:
+    """Path of a state file inside STATE_DIR."""
+    return os.path.join(STATE_DIR, name)
+
+
+def load_state(name) -> dict:
+    """Load a JSON state document, or {} if missing or unreadable."""
+    try:
+        with open(state_path(name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable state file {name} ({type(e).__name__})")
+        return {}
+
+
+def save_state(name, data):
+    """Atomically write a JSON state document (safe with concurrent writers)."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=STATE_DIR, prefix=name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, state_path(name))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
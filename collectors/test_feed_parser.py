@@ -0,0 +1,66 @@
+"""
+Parity check: the fast feed parser against feedparser on small fixtures.
+Run: python -m pytest collectors/test_feed_parser.py (or python -m collectors.test_feed_parser)
+"""
+
+import feedparser
+from collectors.feed_parser import parse_entries
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>Fixture</title>{items}</channel></rss>"""
+
+ATOM = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+<title>Fixture</title>{items}</feed>"""
+
+FIXTURES = {
+    "plain item": RSS.format(items="""
+        <item><title>Plain</title><link>https://example.com/plain</link>
+        <guid>https://example.com/plain</guid><pubDate>Tue, 06 Oct 2026 08:00:00 GMT</pubDate>
+        <description>Summary text</description></item>"""),
+    "media:title before title": RSS.format(items="""
+        <item><media:title>Media T</media:title><title>A &amp; B</title>
+        <link>https://example.com/ab</link></item>"""),
+    "media:title only": RSS.format(items="""
+        <item><media:title>Media only</media:title><link>https://example.com/media</link></item>"""),
+    "dc:title": RSS.format(items="""
+        <item><dc:title>DC title</dc:title><link>https://example.com/dc</link></item>"""),
+    "permalink guid, no link": RSS.format(items="""
+        <item><title>Guid link</title><guid>https://example.com/guid</guid></item>"""),
+    "non-permalink guid, no link": RSS.format(items="""
+        <item><title>No link</title><guid isPermaLink="false">tag:example.com,2026:1</guid></item>"""),
+    "guid before link": RSS.format(items="""
+        <item><title>Both</title><guid>https://example.com/guid</guid><link>https://example.com/link</link></item>"""),
+    "atom entry": ATOM.format(items="""
+        <entry><media:title>Media T</media:title><title>Atom &amp; co</title>
+        <link rel="self" href="https://example.com/self"/><link href="https://example.com/atom"/>
+        <id>urn:uuid:1</id><updated>2026-10-06T08:00:00Z</updated><summary>Atom summary</summary></entry>"""),
+    "atom entry, no link": ATOM.format(items="""
+        <entry><title>Id link</title><id>https://example.com/atom-id</id></entry>"""),
+}
+
+FIELDS = ("title", "link", "id", "summary")
+
+
+def comparable(entry) -> dict:
+    """The fields the collector reads, in a form both parsers share."""
+    fields = {name: entry.get(name) for name in FIELDS}
+    for name in ("published_parsed", "updated_parsed"):
+        value = entry.get(name)
+        fields[name] = tuple(value[:6]) if value else None
+    return fields
+
+
+def test_parity_with_feedparser():
+    for name, document in FIXTURES.items():
+        content = document.encode("utf-8")
+        fast = parse_entries(content)
+        assert fast is not None, f"{name}: fast parser declined the document"
+        expected = feedparser.parse(content).entries
+        assert [comparable(e) for e in fast] == [comparable(e) for e in expected], name
+
+
+if __name__ == "__main__":
+    test_parity_with_feedparser()
+    print(f"OK ({len(FIXTURES)} fixtures)")
@@ -0,0 +1,57 @@
+"""
+zkHetz Source Verification Report
+Result of the last `python -m collectors.verify_sources` run, one record per
+feed URL. The collector skips feeds the report marks as bad until the
+report is older than REPORT_MAX_AGE_HOURS.
+"""
+
+from datetime import datetime, timedelta
+from collectors.state import load_state, save_state
+
+VERIFICATION_FILE = "verification.json"
+
+REPORT_MAX_AGE_HOURS = 7 * 24  # Older verdicts are ignored by the collector
+STALE_DAYS = 180               # Newest entry older than this -> stale
+
+# Verdicts
+OK = "ok"
+STALE = "stale"  # Works, but nothing published in STALE_DAYS
+EMPTY = "empty"  # Works, but no entries
+ERROR = "error"  # Transient failure (5xx, 429, timeout); not skipped
+BAD = "bad"      # Other HTTP or network error, or unparseable
+
+TRANSIENT_ERRORS = ("HTTP 408", "HTTP 429", "Timeout", "ReadTimeout", "ConnectTimeout", "RateLimited")
+
+
+def load_verification() -> dict:
+    """Load the verification report {feed_url: record} from the state dir."""
+    return load_state(VERIFICATION_FILE)
+
+
+def save_verification(report):
+    """Persist the verification report."""
+    save_state(VERIFICATION_FILE, report)
+
+
+def verdict(record) -> str:
+    """Verdict for a verification record (error, entry count, newest entry age)."""
+    error = record.get("error")
+    if error:
+        return ERROR if error in TRANSIENT_ERRORS or error.startswith("HTTP 5") else BAD
+    if not record.get("entries"):
+        return EMPTY
+    age = record.get("newest_age_hours")
+    if age is not None and age > STALE_DAYS * 24:
+        return STALE
+    return OK
+
+
+def is_known_bad(record, now) -> bool:
+    """True if a recent verification run found this feed broken."""
+    if not record or record.get("verdict") != BAD:
+        return False
+    try:
+        checked_at = datetime.fromisoformat(record["checked_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now - checked_at < timedelta(hours=REPORT_MAX_AGE_HOURS)
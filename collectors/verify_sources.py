@@ -0,0 +1,136 @@
+"""
+zkHetz Source Verification
+Checks every configured RSSSource concurrently (each feed URL once) and
+reports HTTP status, latency, entry count, newest entry age and content
+type. The report is saved to the collector state dir, where the collector
+uses it to skip known-bad sources.
+
+    python -m collectors.verify_sources [--category cyber_attacks] [--json report.json]
+"""
+
+import time
+from datetime import datetime
+import requests
+from config.sources import get_all_sources, get_sources_by_category, group_sources_by_url, normalize_url, \
+    SourceCategory, HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT
+from collectors.http_client import get_session, close_session, read_body
+from collectors.ratelimit import HostRateLimiter
+from collectors.rss_collector import fetch_all_concurrently, get_host, parse_feed, entry_published, \
+    MAX_FEED_BYTES, MAX_FEED_SECONDS, MAX_RATE_WAIT, MAX_WORKERS, PER_HOST_LIMIT
+from collectors.verification import load_verification, save_verification, verdict, BAD, ERROR, OK
+
+TIMEOUT = 10
+MAX_VERIFY_ENTRIES = 1000  # Entries counted per feed
+
+
+def verify_feed(sources, limiter=None, timeout=TIMEOUT) -> dict:
+    """Fetch and parse one feed URL; returns its verification record."""
+    url = sources[0].url
+    now = datetime.utcnow()
+    record = {
+        "name": sources[0].name,
+        "url": url,
+        "sources": [s.name for s in sources],
+        "checked_at": now.isoformat(),
+        "http_status": None,
+        "content_type": None,
+        "latency_ms": None,
+        "entries": 0,
+        "newest_age_hours": None,
+        "error": None,
+    }
+    started = time.monotonic()
+    
+    try:
+        if limiter is not None:
+            limiter.acquire(get_host(url))
+        with get_session().get(url, timeout=timeout, verify=True, stream=True) as response:
+            record["http_status"] = response.status_code
+            record["content_type"] = response.headers.get("Content-Type", "").split(";")[0].strip() or None
+            response.raise_for_status()
+            content = read_body(response, MAX_FEED_BYTES, MAX_FEED_SECONDS)
+        record["latency_ms"] = round((time.monotonic() - started) * 1000)
+        
+        entries = parse_feed(content, url, allow_fallback=False, limit=MAX_VERIFY_ENTRIES)
+        if entries is None:
+            record["error"] = "ParseError"
+        else:
+            record["entries"] = len(entries)
+            published = [p for p in (entry_published(e) for e in entries) if p]
+            if published:
+                newest = datetime.fromisoformat(max(published))
+                record["newest_age_hours"] = round((now - newest).total_seconds() / 3600, 1)
+    except requests.exceptions.HTTPError as e:
+        record["error"] = f"HTTP {e.response.status_code}"
+    except Exception as e:
+        record["error"] = type(e).__name__
+    
+    if record["latency_ms"] is None:
+        record["latency_ms"] = round((time.monotonic() - started) * 1000)
+    record["verdict"] = verdict(record)
+    return record
+
+
+def verify_sources(sources, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, timeout=TIMEOUT) -> dict:
+    """Verify every unique feed URL of `sources`; returns {normalized_url: record}."""
+    groups = group_sources_by_url(sources)
+    limiter = HostRateLimiter(HOST_RATE_LIMITS, DEFAULT_HOST_RATE_LIMIT, max_wait=MAX_RATE_WAIT)
+    records = fetch_all_concurrently(groups, lambda group: verify_feed(group, limiter, timeout),
+                                     workers=workers, per_host=per_host)
+    close_session()
+    return {normalize_url(group[0].url): record for group, record in zip(groups, records)}
+
+
+def print_report(report):
+    print(f"{'Feed':<40} {'Verdict':>7} {'HTTP':>5} {'ms':>6} {'Entries':>8} {'Newest (d)':>11}  Content type / error")
+    order = {BAD: 0, ERROR: 1, OK: 3}
+    for record in sorted(report.values(), key=lambda r: (order.get(r["verdict"], 2), r["name"])):
+        age = record["newest_age_hours"]
+        age = f"{age / 24:.0f}" if age is not None else "-"
+        detail = record["error"] or record["content_type"] or "-"
+        print(f"{record['name'][:40]:<40} {record['verdict']:>7} {record['http_status'] or '-':>5} "
+              f"{record['latency_ms']:>6} {record['entries']:>8} {age:>11}  {detail}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    
+    parser = argparse.ArgumentParser(description="zkHetz Source Verification")
+    parser.add_argument("--category", "-c", type=str, help="Verify specific category only")
+    parser.add_argument("--workers", "-w", type=int, default=MAX_WORKERS, help="Feeds checked in parallel")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT, help="Max parallel requests per host")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Request timeout in seconds")
+    parser.add_argument("--json", type=str, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+    
+    if args.category:
+        try:
+            sources = get_sources_by_category(SourceCategory(args.category))
+        except ValueError:
+            parser.error(f"unknown category: {args.category}")
+    else:
+        sources = get_all_sources()
+    
+    print("=" * 60)
+    print("zkHetz Source Verification")
+    print("=" * 60)
+    started = time.monotonic()
+    report = verify_sources(sources, workers=args.workers, per_host=args.per_host, timeout=args.timeout)
+    print_report(report)
+    
+    # Merge into the stored report, so a category run keeps the other verdicts
+    stored = load_verification()
+    stored.update(report)
+    save_verification(stored)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    counts = {}
+    for record in report.values():
+        counts[record["verdict"]] = counts.get(record["verdict"], 0) + 1
+    print("=" * 60)
+    print(f"Feeds: {len(report)} | " + " | ".join(f"{k.capitalize()}: {v}" for k, v in sorted(counts.items())) +
+          f" | {time.monotonic() - started:.1f}s")
+    print("=" * 60)
@@ -0,0 +1,68 @@
+"""
+zkHetz Feed Watermarks
+Per-feed high-water mark (newest published_at plus recently seen entry IDs),
+so entries collected on earlier runs are skipped before items are built.
+"""
+
+from datetime import datetime, timedelta
+from collectors.state import load_state, save_state
+
+WATERMARKS_FILE = "watermarks.json"
+MAX_SEEN_IDS = 100  # Recent entry IDs remembered per feed
+MAX_CLOCK_SKEW = timedelta(minutes=10)  # Publish dates beyond now + this count as now
+
+
+def load_watermarks() -> dict:
+    """Load {feed_url: {"newest": iso, "seen": [ids]}} from the state dir."""
+    return load_state(WATERMARKS_FILE)
+
+
+def save_watermarks(watermarks):
+    """Persist watermarks for the next run."""
+    save_state(WATERMARKS_FILE, watermarks)
+
+
+def entry_id(entry) -> str:
+    """Stable identifier of a feed entry (guid/id, falling back to link)."""
+    return entry.get("id") or entry.get("link", "")
+
+
+def filter_new_entries(entries, mark, published_of, now=None):
+    """
+    Drop entries already covered by the watermark.
+    - An entry whose ID was seen before is skipped
+    - An entry published strictly before the newest known date is skipped
+    `published_of(entry)` returns an ISO date string or None. The mark never
+    moves past `now` (UTC) plus a small skew, so a future-dated entry can't
+    hide the real ones until its date passes.
+    Returns (new_entries, updated_mark).
+    """
+    mark = mark or {}
+    limit = ((now or datetime.utcnow()) + MAX_CLOCK_SKEW).replace(microsecond=0).isoformat()
+    newest = mark.get("newest")
+    if newest and newest > limit:
+        newest = None  # Stored before marks were bounded; seen IDs still apply
+    seen = set(mark.get("seen", []))
+    
+    new_entries = []
+    examined_ids = []
+    newest_seen = newest
+    for entry in entries:
+        eid = entry_id(entry)
+        published = published_of(entry)
+        examined_ids.append(eid)
+        if published and (newest_seen is None or published > newest_seen):
+            newest_seen = min(published, limit)
+        
+        if eid and eid in seen:
+            continue
+        if published and newest and published < newest:
+            continue
+        new_entries.append(entry)
+    
+    recent_ids = list(dict.fromkeys(examined_ids + mark.get("seen", [])))
+    updated_mark = {
+        "newest": newest_seen,
+        "seen": [eid for eid in recent_ids if eid][:MAX_SEEN_IDS],
+    }
+    return new_entries, updated_mark
@@ -0,0 +1,126 @@
+"""
+zkHetz Streaming Writer
+Background thread that saves collected items while fetching continues.
+Feeds hand over their items as they finish; the writer flushes a batch once
+it reaches `batch_size` items or `flush_seconds` after the first pending item,
+so a late crash only loses the last partial batch.
+"""
+
+import queue
+import threading
+import time
+from collectors.seen_index import filter_unseen
+
+_CLOSE = object()
+
+
+class StreamingWriter:
+    """Queue of per-feed item lists, saved in size- or time-bounded batches."""
+    
+    def __init__(self, save, batch_size=100, flush_seconds=5.0, max_pending=256, seen=None, on_saved=None):
+        """
+        `save(items)` stores a batch and returns the number saved.
+        `seen` is an optional SeenIndex used to drop known URLs before saving.
+        `on_saved(tags)` is called with the tags of every feed in a batch
+        once that batch has been stored; the tags of batches that could not
+        be stored are collected in `failed_tags`.
+        """
+        self.save = save
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.seen = seen
+        self.on_saved = on_saved
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._run, name="raw-items-writer", daemon=True)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.saved = 0
+        self.skipped = 0
+        self.failed_batches = 0
+        self.failed_tags = []
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def put(self, items, tag=None):
+        """Queue one feed's items; blocks while the writer is `max_pending` feeds behind."""
+        with self.lock:
+            self.received += len(items)
+        self._put((items, tag))
+    
+    def close(self):
+        """Flush what's pending and wait for the writer to finish."""
+        if self.thread.is_alive():
+            self._put(_CLOSE)
+        self.thread.join()
+    
+    def _put(self, unit):
+        """Queue a unit, raising instead of blocking forever if the writer thread died."""
+        while True:
+            if not self.thread.is_alive():
+                raise RuntimeError("Streaming writer thread stopped")
+            try:
+                self.queue.put(unit, timeout=1)
+                return
+            except queue.Full:
+                continue
+    
+    def _run(self):
+        pending_items = []
+        pending_tags = []
+        first_pending_at = None
+        
+        while True:
+            timeout = None
+            if first_pending_at is not None:
+                timeout = max(0.0, first_pending_at + self.flush_seconds - time.monotonic())
+            try:
+                unit = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                unit = None
+            
+            if unit is _CLOSE:
+                self._flush(pending_items, pending_tags)
+                return
+            
+            if unit is not None:
+                items, tag = unit
+                pending_items.extend(items)
+                pending_tags.append(tag)
+                if first_pending_at is None:
+                    first_pending_at = time.monotonic()
+            
+            timed_out = first_pending_at is not None and time.monotonic() - first_pending_at >= self.flush_seconds
+            if len(pending_items) >= self.batch_size or timed_out:
+                self._flush(pending_items, pending_tags)
+                pending_items = []
+                pending_tags = []
+                first_pending_at = None
+    
+    def _flush(self, items, tags):
+        if not items and not tags:
+            return
+        new_items = filter_unseen(items, self.seen) if self.seen is not None else items
+        self.skipped += len(items) - len(new_items)
+        
+        try:
+            if new_items:
+                self.saved += self.save(new_items)
+        except Exception as e:
+            # Leave state untouched so these feeds are collected again next run
+            self.failed_batches += 1
+            self.failed_tags.extend(tag for tag in tags if tag is not None)
+            print(f"  Writer: failed to save {len(new_items)} items ({type(e).__name__})", flush=True)
+            return
+        
+        try:
+            if self.seen is not None and new_items:
+                self.seen.add_urls(item["url"] for item in new_items)
+                self.seen.save()
+            if self.on_saved:
+                self.on_saved([tag for tag in tags if tag is not None])
+        except Exception as e:
+            # Items are stored; the feeds are fetched again and deduplicated on save
+            self.failed_batches += 1
+            print(f"  Writer: failed to record saved batch ({type(e).__name__})", flush=True)
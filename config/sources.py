@@ -8,9 +8,14 @@ investment, legal_regulations, tech_developments, geopolitics,
 target_israel, target_europe, target_us, target_south_korea, target_japan
 """
 
+import json
+import os
+import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from enum import Enum
+from types import MappingProxyType
+from urllib.parse import urlsplit, urlunsplit
 
 
 class SourceCategory(Enum):
@@ -31,7 +36,47 @@ class SourceCategory(Enum):
     TARGET_JAPAN = "target_japan"
 
 
-@dataclass
+# =============================================================================
+# SOURCE TYPES - dashboard display, classified once when sources are built
+# =============================================================================
+# (type, field, keywords) - first matching rule wins, anything else is MEDIA
+SOURCE_TYPE_RULES = [
+    ("GOVERNMENT", "name", ['cisa', 'ncsc', 'cert', 'bsi', 'anssi', 'enisa', 'nist', 'fbi', 'acsc', 'jpcert', 'jvn',
+                            'ipa', 'incd', 'krcert', 'cccs']),
+    ("GOVERNMENT", "url", ['.gov', '.go.jp', '.go.kr', '.gc.ca', 'europa.eu', 'bund.de']),
+    ("ACADEMIC", "name", ['arxiv', 'ieee', 'acm', 'usenix', 'iacr']),
+    ("NON-PROFIT", "name", ['eff', 'epic', 'fido', 'carnegie', 'brookings', 'rand', 'cfr', 'chatham',
+                            'atlantic council', 'csis', 'belfer', 'stimson', 'access now']),
+    ("INDEPENDENT", "name", ['krebs', 'schneier', 'troy hunt', 'graham cluley', 'risky business', 'lawfare']),
+    ("COMMERCIAL", "name", ['crowdstrike', 'mandiant', 'microsoft', 'google', 'kaspersky', 'sophos',
+                            'sentinelone', 'palo alto', 'unit 42', 'cisco', 'talos', 'fortinet',
+                            'checkpoint', 'check point', 'trend micro', 'cloudflare', 'aws',
+                            'hashicorp', 'proofpoint', 'recorded future', 'eset', 'bitdefender',
+                            'zscaler', 'dragos', 'volexity', 'red canary', 'binary defense',
+                            'intezer', 'huntress', 'cybereason', 'flashpoint', 'intel471',
+                            'sekoia', 'ahnlab', 'thales', 'aware', 'onelogin', 'jumpcloud',
+                            'curity', 'auth0', 'lac security', 'malwarebytes', 'tenable',
+                            'qualys', 'elastic', 'sans']),
+]
+DEFAULT_SOURCE_TYPE = "MEDIA"
+
+# One compiled substring pattern per rule
+_SOURCE_TYPE_PATTERNS = [
+    (source_type, field, re.compile("|".join(re.escape(k) for k in keywords)))
+    for source_type, field, keywords in SOURCE_TYPE_RULES
+]
+
+
+def classify_source_type(name: str, url: str) -> str:
+    """Source type for dashboard display, from the source name/url"""
+    values = {"name": name.lower(), "url": url.lower()}
+    for source_type, field, pattern in _SOURCE_TYPE_PATTERNS:
+        if pattern.search(values[field]):
+            return source_type
+    return DEFAULT_SOURCE_TYPE
+
+
+@dataclass(frozen=True, slots=True)
 class RSSSource:
     """Represents a single RSS feed source"""
     name: str
@@ -40,6 +85,11 @@ class RSSSource:
     language: str = "en"
     priority: int = 1
     description: Optional[str] = None
+    source_type: Optional[str] = None  # Override; classified from name/url if not set
+    
+    def __post_init__(self):
+        if self.source_type is None:
+            object.__setattr__(self, "source_type", classify_source_type(self.name, self.url))
 
 
 # =============================================================================
@@ -273,57 +323,193 @@ TARGET_JAPAN_SOURCES = [
 ]
 
 
+# =============================================================================
+# HOST RATE LIMITS - (requests per second, burst) for hosts serving many feeds
+# =============================================================================
+DEFAULT_HOST_RATE_LIMIT = (2.0, 4)
+
+HOST_RATE_LIMITS = {
+    "feeds.feedburner.com": (1.0, 3),
+    "www.cisa.gov": (0.5, 2),
+    "www.ncsc.gov.uk": (0.5, 2),
+    "www.paloaltonetworks.com": (0.5, 2),
+    "github.com": (0.5, 2),
+    "techcrunch.com": (1.0, 2),
+    "www.theregister.com": (1.0, 2),
+    "www.rand.org": (0.5, 2),
+}
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
-def get_all_sources() -> List[RSSSource]:
+BUILTIN_SOURCES = (
+    CYBER_ATTACKS_SOURCES +
+    AUTH_IDENTITY_SOURCES +
+    SAAS_SECURITY_SOURCES +
+    ADVERSARY_CYBER_SOURCES +
+    RESEARCH_UPDATES_SOURCES +
+    INVESTMENT_SOURCES +
+    LEGAL_REGULATIONS_SOURCES +
+    TECH_DEVELOPMENTS_SOURCES +
+    GEOPOLITICS_SOURCES +
+    TARGET_ISRAEL_SOURCES +
+    TARGET_EUROPE_SOURCES +
+    TARGET_US_SOURCES +
+    TARGET_SOUTH_KOREA_SOURCES +
+    TARGET_JAPAN_SOURCES
+)
+
+# Optional JSON/YAML file replacing the built-in source lists
+SOURCES_FILE = os.getenv("ZKHETZ_SOURCES_FILE")
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a feed URL so duplicate listings compare equal"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
+
+def get_url_host(url: str) -> str:
+    """Lowercase host of a feed URL"""
+    return (urlsplit(url.strip()).hostname or "").lower()
+
+
+def _index(sources, key) -> dict:
+    index = {}
+    for source in sources:
+        index.setdefault(key(source), []).append(source)
+    return {k: tuple(v) for k, v in index.items()}
+
+
+class SourceRegistry:
+    """
+    Immutable set of sources, indexed once by category, language, priority,
+    host and normalized URL. The same URL may be listed under several
+    categories; an exact repeat (same URL and category) is dropped at load.
+    Attributes are read-only and the indexes are read-only mappings.
+    """
+    __slots__ = ("_sources", "_duplicates", "_by_category", "_by_language", "_by_priority", "_by_host", "_by_url")
+    
+    def __init__(self, sources: Iterable[RSSSource]):
+        unique = []
+        duplicates = []
+        seen = set()
+        for source in sources:
+            key = (normalize_url(source.url), source.category)
+            if key in seen:
+                duplicates.append(source)
+                continue
+            seen.add(key)
+            unique.append(source)
+        
+        self._sources = tuple(unique)
+        self._duplicates = tuple(duplicates)
+        self._by_category = MappingProxyType(_index(unique, lambda s: s.category))
+        self._by_language = MappingProxyType(_index(unique, lambda s: s.language))
+        self._by_priority = MappingProxyType(_index(unique, lambda s: s.priority))
+        self._by_host = MappingProxyType(_index(unique, lambda s: get_url_host(s.url)))
+        self._by_url = MappingProxyType(_index(unique, lambda s: normalize_url(s.url)))
+    
+    sources = property(lambda self: self._sources)
+    duplicates = property(lambda self: self._duplicates)
+    by_category = property(lambda self: self._by_category)
+    by_language = property(lambda self: self._by_language)
+    by_priority = property(lambda self: self._by_priority)
+    by_host = property(lambda self: self._by_host)
+    by_url = property(lambda self: self._by_url)
+    
+    def __len__(self):
+        return len(self._sources)
+    
+    def shared_urls(self) -> Dict[str, Tuple[RSSSource, ...]]:
+        """URLs listed under more than one category"""
+        return {url: group for url, group in self._by_url.items() if len(group) > 1}
+
+
+def load_sources_file(path: str) -> SourceRegistry:
+    """
+    Build a registry from a JSON or YAML file: a list of sources (or
+    {"sources": [...]}) with the RSSSource fields, category as its value.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required to load YAML sources: pip install pyyaml")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    
+    if isinstance(data, dict):
+        data = data.get("sources", [])
+    sources = [RSSSource(**{**entry, "category": SourceCategory(entry["category"])}) for entry in data]
+    return SourceRegistry(sources)
+
+
+# Global registry (lazy initialized)
+_registry = None
+
+
+def get_registry() -> SourceRegistry:
+    """Get the source registry, building it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = load_sources_file(SOURCES_FILE) if SOURCES_FILE else SourceRegistry(BUILTIN_SOURCES)
+        if _registry.duplicates:
+            names = ", ".join(f"{s.name} ({s.category.value})" for s in _registry.duplicates)
+            print(f"Ignoring duplicate source listings: {names}")
+    return _registry
+
+
+def get_all_sources() -> Tuple[RSSSource, ...]:
     """Get all configured RSS sources"""
-    return (
-        CYBER_ATTACKS_SOURCES +
-        AUTH_IDENTITY_SOURCES +
-        SAAS_SECURITY_SOURCES +
-        ADVERSARY_CYBER_SOURCES +
-        RESEARCH_UPDATES_SOURCES +
-        INVESTMENT_SOURCES +
-        LEGAL_REGULATIONS_SOURCES +
-        TECH_DEVELOPMENTS_SOURCES +
-        GEOPOLITICS_SOURCES +
-        TARGET_ISRAEL_SOURCES +
-        TARGET_EUROPE_SOURCES +
-        TARGET_US_SOURCES +
-        TARGET_SOUTH_KOREA_SOURCES +
-        TARGET_JAPAN_SOURCES
-    )
-
-
-def get_sources_by_category(category: SourceCategory) -> List[RSSSource]:
+    return get_registry().sources
+
+
+def get_sources_by_category(category: SourceCategory) -> Tuple[RSSSource, ...]:
     """Get sources for a specific category"""
-    return [s for s in get_all_sources() if s.category == category]
+    return get_registry().by_category.get(category, ())
 
 
-def get_high_priority_sources() -> List[RSSSource]:
+def get_high_priority_sources() -> Tuple[RSSSource, ...]:
     """Get only high priority (priority=1) sources"""
-    return [s for s in get_all_sources() if s.priority == 1]
+    return get_registry().by_priority.get(1, ())
 
 
-def get_sources_by_language(language: str) -> List[RSSSource]:
+def get_sources_by_language(language: str) -> Tuple[RSSSource, ...]:
     """Get sources by language code"""
-    return [s for s in get_all_sources() if s.language == language]
+    return get_registry().by_language.get(language, ())
+
+
+def get_sources_by_host(host: str) -> Tuple[RSSSource, ...]:
+    """Get sources served from a host"""
+    return get_registry().by_host.get(host.lower(), ())
+
+
+def group_sources_by_url(sources: Sequence[RSSSource]) -> List[List[RSSSource]]:
+    """Group sources sharing the same normalized URL, in first-seen order"""
+    groups = {}
+    for source in sources:
+        groups.setdefault(normalize_url(source.url), []).append(source)
+    return list(groups.values())
 
 
 def get_source_stats() -> dict:
     """Get statistics about configured sources"""
-    all_sources = get_all_sources()
-    by_category = {}
-    for cat in SourceCategory:
-        count = len([s for s in all_sources if s.category == cat])
-        if count > 0:
-            by_category[cat.value] = count
-    by_language = {}
-    for source in all_sources:
-        by_language[source.language] = by_language.get(source.language, 0) + 1
+    registry = get_registry()
+    by_category = {cat.value: len(registry.by_category[cat]) for cat in SourceCategory if cat in registry.by_category}
+    by_language = {lang: len(sources) for lang, sources in registry.by_language.items()}
     return {
-        "total": len(all_sources),
+        "total": len(registry),
+        "unique_urls": len(registry.by_url),
+        "hosts": len(registry.by_host),
         "by_category": by_category,
         "by_language": by_language,
     }
@@ -334,7 +520,7 @@ if __name__ == "__main__":
     print("=" * 50)
     print("zkHetz Brain Center - Sources (All Verified)")
     print("=" * 50)
-    print(f"Total: {stats['total']}")
+    print(f"Total: {stats['total']} | Unique URLs: {stats['unique_urls']} | Hosts: {stats['hosts']}")
     print("\nBy Category:")
     for cat, count in sorted(stats['by_category'].items()):
         print(f"  {cat:<20} {count:>3}")
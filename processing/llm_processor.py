@@ -3,7 +3,7 @@ import json
 import re
 import anthropic
 from datetime import datetime
-from utils.db import get_raw_items_with_freshness, get_freshness_hours, supabase
+from utils.db import get_raw_items_with_freshness, get_freshness_hours, publish_daily
 
 # Replace with YOUR key
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -948,10 +948,8 @@ def save_daily_items(items, sentiment_data):
     
     today = datetime.now().date().isoformat()
     
-    supabase.table("daily_items").delete().eq("date", today).execute()
-    
-    for item in items:
-        supabase.table("daily_items").insert({
+    rows = [
+        {
             "date": today,
             "category": item["category"],
             "rank": item["rank"],
@@ -964,16 +962,19 @@ def save_daily_items(items, sentiment_data):
             "involves_key_theft": item.get("involves_key_theft", False),
             "key_theft_type": item.get("key_theft_type"),
             "published_at": item.get("published_at")
-        }).execute()
-    
-    supabase.table("daily_sentiment").delete().eq("date", today).execute()
-    supabase.table("daily_sentiment").insert({
+        }
+        for item in items
+    ]
+    sentiment = {
         "date": today,
         "west_sentiment": sentiment_data["west_sentiment"],
         "west_explanation": sentiment_data["west_explanation"],
         "adversary_sentiment": sentiment_data["adversary_sentiment"],
         "adversary_explanation": sentiment_data["adversary_explanation"]
-    }).execute()
+    }
+    
+    # Whole day in one atomic publish - the dashboard never sees it half-written
+    publish_daily(today, rows, sentiment)
     
     print(f"  Saved to database")
 
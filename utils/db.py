@@ -1,80 +1,102 @@
-from supabase import create_client
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
 import os
+import queue
+import threading
+from utils.storage import get_backend, BulkWriteError, RAW_ITEM_COLUMNS
 
-# Config - use env vars with fallback defaults
-SUPABASE_URL = os.getenv("SUPABASE_URL", "https://knodraujylbsglscdrgh.supabase.co")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY", "sb_publishable_NMHD3aib86R8k-fw7mTC9Q_k2QtoFNc")
+READ_AHEAD_ROWS = 1000  # Rows a time-slice reader may hold before load_raw_items gets to its slice
+_END = object()
 
-# Global client (lazy initialized)
-_supabase_client = None
 
+def save_raw_items(items, retry=True):
+    """Save raw items (skipping known URLs); returns the number of new rows."""
+    if not items:
+        return 0
+    return get_backend().save_raw_items(items, retry)
 
-def get_supabase():
-    """Get Supabase client, creating new one if needed."""
-    global _supabase_client
-    if _supabase_client is None:
-        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    return _supabase_client
 
+def get_raw_item_urls():
+    """Get the URL of every stored raw item."""
+    return get_backend().get_raw_item_urls()
 
-def reconnect():
-    """Force reconnection to Supabase."""
-    global _supabase_client
-    _supabase_client = None
-    return get_supabase()
 
+def iter_raw_items(since, until=None, columns=RAW_ITEM_COLUMNS, fresh_since=None, newest_first=False):
+    """
+    Yield raw items collected in [since, until), oldest first (or newest
+    first). With `fresh_since`, only items published (or, if undated,
+    created) since then.
+    """
+    return get_backend().iter_raw_items(since, until, columns, fresh_since, newest_first)
 
-def save_raw_items(items, retry=True):
-    """Save raw items to database."""
-    if not items:
-        return 0
-    
-    supabase = get_supabase()
+
+def iter_raw_items_after(after_id, since, columns=RAW_ITEM_COLUMNS):
+    """Yield raw items inserted after id `after_id` and collected since `since`, in id order."""
+    return get_backend().iter_raw_items_after(after_id, since, columns)
+
+
+def load_raw_items(limit=2500, days=7, columns=RAW_ITEM_COLUMNS, fresh_since=None, workers=None):
+    """
+    Load the newest `limit` raw items collected in the last `days` days,
+    newest first. The window is split into `workers` time slices (default:
+    the backend's read_workers) that are read concurrently, each newest
+    first and at most READ_AHEAD_ROWS rows ahead of the slice being
+    consumed. Reading stops once `limit` rows are collected.
+    """
+    now = datetime.utcnow()
+    start = now - timedelta(days=days)
+    workers = max(1, workers or get_backend().read_workers)
+    if workers == 1:
+        return list(islice(iter_raw_items(start, None, columns, fresh_since, newest_first=True), limit))
     
-    try:
-        for i in range(0, len(items), 100):
-            batch = items[i:i+100]
-            supabase.table("raw_items").insert(batch).execute()
-        return len(items)
-    except Exception as e:
-        if retry:
-            print(f"Connection error, retrying... ({e})")
-            reconnect()
-            return save_raw_items(items, retry=False)
-        raise
-
-
-def get_raw_items(limit=2500, retry=True):
-    """Get all raw items from last 7 days."""
-    cutoff = (datetime.utcnow() - timedelta(days=7)).isoformat()
-    supabase = get_supabase()
+    # Slice i covers [bounds[i + 1], bounds[i]); the newest slice is open-ended
+    bounds = [None] + [now - (now - start) * i / workers for i in range(1, workers)] + [start]
+    queues = [queue.Queue(maxsize=READ_AHEAD_ROWS) for _ in range(workers)]
+    stop = threading.Event()
     
-    try:
-        all_items = []
-        offset = 0
-        batch_size = 1000
-        
-        while len(all_items) < limit:
-            result = (
-                supabase.table("raw_items")
-                .select("*")
-                .gte("collected_at", cutoff)
-                .range(offset, offset + batch_size - 1)
-                .execute()
-            )
-            all_items.extend(result.data)
-            if len(result.data) < batch_size:
-                break
-            offset += batch_size
+    def read_slice(i):
+        def put(value):
+            while not stop.is_set():
+                try:
+                    queues[i].put(value, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
         
-        return all_items[:limit]
-    except Exception as e:
-        if retry:
-            print(f"Connection error, retrying... ({e})")
-            reconnect()
-            return get_raw_items(limit, retry=False)
-        raise
+        try:
+            for row in iter_raw_items(bounds[i + 1], bounds[i], columns, fresh_since, newest_first=True):
+                if not put(row):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(_END)
+    
+    items = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for i in range(workers):
+            executor.submit(read_slice, i)
+        try:
+            for rows in queues:
+                while len(items) < limit:
+                    row = rows.get()
+                    if row is _END:
+                        break
+                    if isinstance(row, Exception):
+                        raise row
+                    items.append(row)
+                if len(items) >= limit:
+                    break
+        finally:
+            stop.set()
+    return items
+
+
+def get_raw_items(limit=2500):
+    """Get the newest raw items from the last 7 days (processor columns only)."""
+    return load_raw_items(limit)
 
 
 def get_freshness_hours():
@@ -84,10 +106,29 @@ def get_freshness_hours():
     return 24
 
 
-def get_raw_items_with_freshness(limit=2500):
-    items = get_raw_items(limit)
+def get_raw_items_with_freshness(limit=2500, fresh_only=False):
+    """
+    Raw items of the last 7 days, each flagged `is_fresh`. With
+    `fresh_only`, the freshness filter runs in the database and only
+    fresh items are loaded. If RAW_ITEMS_MIRROR is set, the local mirror
+    is synced (new rows only) and answers instead.
+    """
     fresh_hours = get_freshness_hours()
     fresh_cutoff = datetime.utcnow() - timedelta(hours=fresh_hours)
+    fresh_since = fresh_cutoff if fresh_only else None
+    
+    if os.getenv("RAW_ITEMS_MIRROR"):
+        # Imported here: the mirror syncs through this module
+        from utils.mirror import RawItemsMirror
+        mirror = RawItemsMirror(os.getenv("RAW_ITEMS_MIRROR"))
+        try:
+            pulled = mirror.sync()
+            print(f"Mirror: pulled {pulled} new rows")
+            items = mirror.load(limit, fresh_since=fresh_since)
+        finally:
+            mirror.close()
+    else:
+        items = load_raw_items(limit, fresh_since=fresh_since)
     
     for item in items:
         published = item.get("published_at")
@@ -117,21 +158,19 @@ def get_raw_items_with_freshness(limit=2500):
     return items
 
 
+def publish_daily(date, rows, sentiment):
+    """Atomically replace the daily_items and daily_sentiment of `date`."""
+    get_backend().publish_daily(date, rows, sentiment)
+
+
 def clear_raw_items():
-    supabase = get_supabase()
-    supabase.table("raw_items").delete().neq("title", "").execute()
+    get_backend().clear_raw_items()
 
 
 def clear_daily_items():
-    supabase = get_supabase()
-    supabase.table("daily_items").delete().neq("headline", "").execute()
+    get_backend().clear_daily_items()
 
 
 def clear_old_raw_items(days=7):
-    supabase = get_supabase()
-    cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-    supabase.table("raw_items").delete().lt("collected_at", cutoff).execute()
+    get_backend().clear_old_raw_items(datetime.utcnow() - timedelta(days=days))
     print(f"Cleared items older than {days} days")
-
-
-supabase = get_supabase()
@@ -0,0 +1,100 @@
+"""
+Local SQLite mirror of raw_items.
+Each sync pulls only rows inserted since the mirror's highest id (assigned
+by the database, so late-merged shards and collector clock skew don't hide
+rows) and drops rows that left the 7-day window, so repeated processor runs
+read locally instead of downloading the whole window again. Enabled by
+setting RAW_ITEMS_MIRROR to a file path.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from utils.db import iter_raw_items_after, RAW_ITEM_COLUMNS
+
+MIRROR_PATH = os.getenv("RAW_ITEMS_MIRROR", "")
+
+WINDOW_DAYS = 7
+SYNC_OVERLAP_IDS = 1000  # Re-read one page of ids below the watermark (batches committed out of order)
+
+COLUMNS = RAW_ITEM_COLUMNS.split(",")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS raw_items (
+    id INTEGER PRIMARY KEY,
+    {", ".join(f"{c} TEXT" for c in COLUMNS if c != "id")}
+);
+CREATE INDEX IF NOT EXISTS raw_items_collected_at ON raw_items (collected_at, id);
+"""
+
+
+class RawItemsMirror:
+    """SQLite copy of the recent raw_items window."""
+    
+    def __init__(self, path=MIRROR_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+    
+    def close(self):
+        self.conn.close()
+    
+    def watermark(self):
+        """Highest raw_items id in the mirror, or None if empty."""
+        return self.conn.execute("SELECT MAX(id) FROM raw_items").fetchone()[0]
+    
+    def sync(self, now=None) -> int:
+        """Pull new rows from the database and prune old ones; returns the number of new rows."""
+        now = now or datetime.utcnow()
+        window_start = now - timedelta(days=WINDOW_DAYS)
+        mark = self.watermark()
+        after_id = mark - SYNC_OVERLAP_IDS if mark is not None else None
+        
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        insert = f"INSERT OR REPLACE INTO raw_items ({', '.join(COLUMNS)}) VALUES ({placeholders})"
+        pulled = 0
+        batch = []
+        with self.conn:
+            for row in iter_raw_items_after(after_id, window_start):
+                batch.append(tuple(row.get(c) for c in COLUMNS))
+                if mark is None or row["id"] > mark:
+                    pulled += 1
+                if len(batch) >= 1000:
+                    self.conn.executemany(insert, batch)
+                    batch = []
+            self.conn.executemany(insert, batch)
+            self.conn.execute("DELETE FROM raw_items WHERE collected_at < ?", (window_start.isoformat(),))
+        return pulled
+    
+    def load(self, limit=2500, days=WINDOW_DAYS, fresh_since=None) -> list:
+        """Newest `limit` raw items collected in the last `days` days, newest first (like load_raw_items)."""
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        query = f"SELECT {', '.join(COLUMNS)} FROM raw_items WHERE collected_at >= ?"
+        params = [cutoff]
+        if fresh_since is not None:
+            query += " AND (published_at >= ? OR (published_at IS NULL AND created_at >= ?))"
+            params += [fresh_since.isoformat()] * 2
+        query += " ORDER BY collected_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(query, params)]
+    
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM raw_items").fetchone()[0]
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sync the local raw_items mirror")
+    parser.add_argument("--path", default=MIRROR_PATH or ".collector_state/raw_items.sqlite", help="Mirror file")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the mirror and sync the full window")
+    args = parser.parse_args()
+    
+    if args.rebuild and os.path.exists(args.path):
+        os.remove(args.path)
+    mirror = RawItemsMirror(args.path)
+    pulled = mirror.sync()
+    print(f"Mirror {args.path}: pulled {pulled} rows, {len(mirror)} in window (up to id {mirror.watermark()})")
+    mirror.close()
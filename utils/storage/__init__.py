@@ -0,0 +1,45 @@
+"""
+Storage backends for raw_items, daily_items and daily_sentiment.
+STORAGE_BACKEND picks the implementation: "supabase" (default, the hosted
+database) or "sqlite" (a local file at STORAGE_SQLITE_PATH, no network).
+"""
+
+import os
+import threading
+from utils.storage.base import StorageBackend, BulkWriteError, RAW_ITEM_COLUMNS
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+
+# Global backend (lazy initialized)
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name=None) -> StorageBackend:
+    """Create a storage backend by name (default: STORAGE_BACKEND)."""
+    name = (name or STORAGE_BACKEND).lower()
+    # Imported here so the sqlite backend works without the supabase package
+    if name == "supabase":
+        from utils.storage.supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    if name == "sqlite":
+        from utils.storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend()
+    raise ValueError(f"Unknown storage backend '{name}' (expected supabase or sqlite)")
+
+
+def get_backend() -> StorageBackend:
+    """Get the configured backend, creating it if needed (thread-safe)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend):
+    """Use `backend` for the rest of the process (e.g. benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
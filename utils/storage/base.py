@@ -0,0 +1,66 @@
+"""
+Storage backend interface for raw_items, daily_items and daily_sentiment.
+"""
+
+from abc import ABC, abstractmethod
+
+# Columns the processor reads from raw_items
+RAW_ITEM_COLUMNS = "id,title,content,url,source_name,source_type,category,published_at,collected_at,created_at"
+
+
+class BulkWriteError(Exception):
+    """Some batches failed after all retries; `inserted` counts the rows that were written."""
+    
+    def __init__(self, message, inserted):
+        super().__init__(message)
+        self.inserted = inserted
+
+
+class StorageBackend(ABC):
+    """Operations the collector and processor need from storage."""
+    
+    name = "base"
+    read_workers = 1  # Time slices load_raw_items reads in parallel
+    
+    @abstractmethod
+    def save_raw_items(self, items, retry=True) -> int:
+        """Insert items, skipping URLs already stored; returns the number of new rows."""
+    
+    @abstractmethod
+    def iter_raw_items(self, since, until=None, columns=RAW_ITEM_COLUMNS, fresh_since=None, newest_first=False):
+        """
+        Yield raw items collected in [since, until), ordered by (collected_at, id)
+        (descending with `newest_first`). With `fresh_since`, only items
+        published (or, if undated, created) since then.
+        """
+    
+    @abstractmethod
+    def iter_raw_items_after(self, after_id, since, columns=RAW_ITEM_COLUMNS):
+        """
+        Yield raw items with id > `after_id` (None = all) collected since
+        `since`, in id order. The id is assigned by the database on insert,
+        so this finds late inserts whatever their collected_at.
+        """
+    
+    @abstractmethod
+    def get_raw_item_urls(self) -> list:
+        """URL of every stored raw item."""
+    
+    @abstractmethod
+    def clear_raw_items(self):
+        """Delete every raw item."""
+    
+    @abstractmethod
+    def clear_old_raw_items(self, cutoff):
+        """Delete raw items collected before `cutoff`."""
+    
+    @abstractmethod
+    def publish_daily(self, date, rows, sentiment):
+        """
+        Replace the daily_items and daily_sentiment of `date` in one atomic
+        step, so readers never see a partially published day.
+        """
+    
+    @abstractmethod
+    def clear_daily_items(self):
+        """Delete every daily item."""
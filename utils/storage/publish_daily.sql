@@ -0,0 +1,28 @@
+-- Atomic daily publish used by SupabaseBackend.publish_daily.
+-- Replaces a day's daily_items and daily_sentiment in one transaction, so
+-- readers see either the previous or the new day, never a partial one.
+-- Install once in the Supabase SQL editor.
+
+create or replace function publish_daily(p_date date, p_items jsonb, p_sentiment jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    inserted integer;
+begin
+    delete from daily_items where date = p_date;
+    insert into daily_items (date, category, rank, headline, summary, source_name, source_url, source_type,
+                             is_fresh, involves_key_theft, key_theft_type, published_at)
+    select p_date, category, rank, headline, summary, source_name, source_url, source_type,
+           coalesce(is_fresh, false), coalesce(involves_key_theft, false), key_theft_type, published_at
+    from jsonb_populate_recordset(null::daily_items, p_items);
+    get diagnostics inserted = row_count;
+
+    delete from daily_sentiment where date = p_date;
+    insert into daily_sentiment (date, west_sentiment, west_explanation, adversary_sentiment, adversary_explanation)
+    select p_date, west_sentiment, west_explanation, adversary_sentiment, adversary_explanation
+    from jsonb_populate_record(null::daily_sentiment, p_sentiment);
+
+    return inserted;
+end;
+$$;
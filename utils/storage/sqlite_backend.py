@@ -0,0 +1,171 @@
+"""
+Embedded SQLite storage backend: the same tables in a local file, so the
+whole pipeline can run (and be benchmarked) on one machine with no network.
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from utils.storage.base import StorageBackend, RAW_ITEM_COLUMNS
+
+SQLITE_PATH = os.getenv("STORAGE_SQLITE_PATH", "data/zkhetz.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    content TEXT,
+    raw_content TEXT,
+    url TEXT UNIQUE,
+    source_name TEXT,
+    source_type TEXT,
+    category TEXT,
+    published_at TEXT,
+    collected_at TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS raw_items_collected_at ON raw_items (collected_at, id);
+
+CREATE TABLE IF NOT EXISTS daily_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    category TEXT,
+    rank INTEGER,
+    headline TEXT,
+    summary TEXT,
+    source_name TEXT,
+    source_url TEXT,
+    source_type TEXT,
+    is_fresh INTEGER,
+    involves_key_theft INTEGER,
+    key_theft_type TEXT,
+    published_at TEXT
+);
+CREATE INDEX IF NOT EXISTS daily_items_date ON daily_items (date);
+
+CREATE TABLE IF NOT EXISTS daily_sentiment (
+    date TEXT PRIMARY KEY,
+    west_sentiment,
+    west_explanation TEXT,
+    adversary_sentiment,
+    adversary_explanation TEXT
+);
+"""
+
+
+class SQLiteBackend(StorageBackend):
+    """Tables in a local SQLite file (STORAGE_SQLITE_PATH)."""
+    
+    name = "sqlite"
+    
+    def __init__(self, path=SQLITE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        with self.connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self.columns = {table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+                            for table in ("raw_items", "daily_items", "daily_sentiment")}
+        conn.close()
+    
+    def connect(self):
+        """New connection (one per operation, so threads don't share one)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def insert_sql(self, table, rows, verb="INSERT"):
+        """INSERT statement and parameter tuples for the table columns present in `rows`."""
+        columns = [c for c in self.columns[table] if any(c in row for row in rows)]
+        sql = f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        return sql, [tuple(row.get(c) for c in columns) for row in rows]
+    
+    def save_raw_items(self, items, retry=True):
+        created_at = datetime.utcnow().isoformat()
+        rows = [{"created_at": created_at, **item} for item in items if item.get("url")]
+        if not rows:
+            return 0
+        sql, params = self.insert_sql("raw_items", rows, "INSERT OR IGNORE")
+        conn = self.connect()
+        try:
+            with conn:
+                before = conn.total_changes
+                conn.executemany(sql, params)
+                return conn.total_changes - before
+        finally:
+            conn.close()
+    
+    def iter_raw_items(self, since, until=None, columns=RAW_ITEM_COLUMNS, fresh_since=None, newest_first=False):
+        query = f"SELECT {columns} FROM raw_items WHERE collected_at >= ?"
+        params = [since.isoformat()]
+        if until is not None:
+            query += " AND collected_at < ?"
+            params.append(until.isoformat())
+        if fresh_since is not None:
+            query += " AND (published_at >= ? OR (published_at IS NULL AND created_at >= ?))"
+            params += [fresh_since.isoformat()] * 2
+        query += " ORDER BY collected_at DESC, id DESC" if newest_first else " ORDER BY collected_at, id"
+        
+        conn = self.connect()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    def iter_raw_items_after(self, after_id, since, columns=RAW_ITEM_COLUMNS):
+        conn = self.connect()
+        try:
+            cursor = conn.execute(f"SELECT {columns} FROM raw_items WHERE id > ? AND collected_at >= ? ORDER BY id",
+                                  (after_id if after_id is not None else -1, since.isoformat()))
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+    
+    def get_raw_item_urls(self):
+        conn = self.connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT url FROM raw_items WHERE url IS NOT NULL")]
+        finally:
+            conn.close()
+    
+    def execute(self, sql, params=()):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(sql, params)
+        finally:
+            conn.close()
+    
+    def clear_raw_items(self):
+        self.execute("DELETE FROM raw_items")
+    
+    def clear_old_raw_items(self, cutoff):
+        self.execute("DELETE FROM raw_items WHERE collected_at < ?", (cutoff.isoformat(),))
+    
+    def publish_daily(self, date, rows, sentiment):
+        conn = self.connect()
+        try:
+            # One transaction: readers see the previous day until it commits
+            with conn:
+                conn.execute("DELETE FROM daily_items WHERE date = ?", (date,))
+                if rows:
+                    sql, params = self.insert_sql("daily_items", [{**row, "date": date} for row in rows])
+                    conn.executemany(sql, params)
+                sql, params = self.insert_sql("daily_sentiment", [{**sentiment, "date": date}], "INSERT OR REPLACE")
+                conn.execute(sql, params[0])
+        finally:
+            conn.close()
+    
+    def clear_daily_items(self):
+        self.execute("DELETE FROM daily_items")
@@ -0,0 +1,291 @@
+"""
+Supabase (hosted Postgres via PostgREST) storage backend.
+"""
+
+from supabase import create_client
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod, ReturnMethod
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+from utils.storage.base import StorageBackend, BulkWriteError, RAW_ITEM_COLUMNS
+
+# Config - use env vars with fallback defaults
+SUPABASE_URL = os.getenv("SUPABASE_URL", "https://knodraujylbsglscdrgh.supabase.co")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY", "sb_publishable_NMHD3aib86R8k-fw7mTC9Q_k2QtoFNc")
+
+# Bulk writes - rows are upserted on url in batches of about WRITE_BATCH_BYTES,
+# with WRITE_WORKERS batches in flight
+WRITE_BATCH_BYTES = 256 * 1024
+WRITE_BATCH_MAX_ROWS = 500
+WRITE_WORKERS = int(os.getenv("DB_WRITE_WORKERS", "4"))
+WRITE_ATTEMPTS = 3  # Per batch; each retry splits the failed rows in halves
+
+# Reads - keyset page size, and time slices loaded in parallel
+READ_PAGE_SIZE = 1000
+READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "4"))
+
+# Postgres function that publishes a day atomically (see publish_daily.sql).
+# Without it publishing fails, unless PUBLISH_NON_ATOMIC=1 opts in to a
+# delete-then-insert replace that readers can see half-done
+PUBLISH_FUNCTION = "publish_daily"
+ALLOW_NON_ATOMIC_PUBLISH = os.getenv("PUBLISH_NON_ATOMIC", "0") == "1"
+
+# Global client (lazy initialized)
+_supabase_client = None
+
+
+def get_supabase():
+    """Get Supabase client, creating new one if needed."""
+    global _supabase_client
+    if _supabase_client is None:
+        _supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase_client
+
+
+def reconnect():
+    """Force reconnection to Supabase."""
+    global _supabase_client
+    _supabase_client = None
+    return get_supabase()
+
+
+def row_size(row) -> int:
+    """Rough JSON size of a row, for batch sizing."""
+    return 32 + sum(len(k) + len(v) + 6 if isinstance(v, str) else len(k) + 16 for k, v in row.items())
+
+
+def make_batches(rows, max_bytes=WRITE_BATCH_BYTES, max_rows=WRITE_BATCH_MAX_ROWS):
+    """Split rows into batches of about `max_bytes` payload (and at most `max_rows` rows)."""
+    batches = []
+    batch = []
+    size = 0
+    for row in rows:
+        n = row_size(row)
+        if batch and (size + n > max_bytes or len(batch) >= max_rows):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(row)
+        size += n
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def upsert_batch(table, batch, on_conflict, attempts=WRITE_ATTEMPTS):
+    """
+    Insert one batch, skipping rows whose `on_conflict` key already exists.
+    Failed rows are retried (after a reconnect) in halves, so a bad row or
+    an oversized payload doesn't sink the whole batch and rows already
+    written are not resent. Returns the number of rows inserted.
+    """
+    inserted = 0
+    pending = [batch]
+    for attempt in range(attempts):
+        failed = []
+        error = None
+        for part in pending:
+            try:
+                result = (
+                    get_supabase().table(table)
+                    .upsert(part, on_conflict=on_conflict, ignore_duplicates=True,
+                            returning=ReturnMethod.minimal, count=CountMethod.exact)
+                    .execute()
+                )
+                inserted += result.count if result.count is not None else len(result.data or [])
+            except Exception as e:
+                failed.append(part)
+                error = e
+        
+        if not failed:
+            return inserted
+        if attempt + 1 < attempts:
+            print(f"Batch write failed, retrying {sum(len(p) for p in failed)} rows... ({error})")
+            reconnect()
+            time.sleep(2 ** attempt)
+            pending = [half for part in failed
+                       for half in ((part[:len(part) // 2], part[len(part) // 2:]) if len(part) > 1 else (part,))]
+    
+    raise BulkWriteError(f"{sum(len(p) for p in failed)} rows of {table} not written ({error})", inserted)
+
+
+def bulk_upsert(table, rows, on_conflict, workers=WRITE_WORKERS, attempts=WRITE_ATTEMPTS):
+    """
+    Idempotent bulk insert: rows are deduplicated on `on_conflict`, split
+    into size-based batches and written with `workers` batches in flight.
+    Returns the number of new rows; raises BulkWriteError (with the
+    inserted count) if any batch still fails after its retries.
+    """
+    unique = {}
+    for row in rows:
+        unique.setdefault(row.get(on_conflict), row)
+    batches = make_batches(list(unique.values()))
+    if not batches:
+        return 0
+    
+    get_supabase()  # Create the client once, before the writer threads share it
+    inserted = 0
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        futures = [executor.submit(upsert_batch, table, batch, on_conflict, attempts) for batch in batches]
+        for future in futures:
+            try:
+                inserted += future.result()
+            except BulkWriteError as e:
+                inserted += e.inserted
+                errors.append(e)
+    
+    if errors:
+        raise BulkWriteError(f"{len(errors)} of {len(batches)} batches failed ({errors[0]})", inserted)
+    return inserted
+
+
+def get_raw_item_urls(page_size=READ_PAGE_SIZE, retry=True):
+    """Get the URL of every stored raw item (keyset-paginated on id)."""
+    urls = []
+    last_id = None
+    while True:
+        try:
+            query = get_supabase().table("raw_items").select("id,url")
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data
+        except Exception as e:
+            if not retry:
+                raise
+            # Resume after the last page read, not from the start
+            print(f"Connection error, retrying... ({e})")
+            reconnect()
+            retry = False
+            continue
+        
+        urls.extend(row["url"] for row in rows if row.get("url"))
+        if len(rows) < page_size:
+            return urls
+        last_id = rows[-1]["id"]
+
+
+def iter_raw_items(since, until=None, columns=RAW_ITEM_COLUMNS, fresh_since=None, newest_first=False,
+                   page_size=READ_PAGE_SIZE, retry=True):
+    """
+    Yield raw items collected in [since, until), oldest first (or newest
+    first), one page at a time. Pages are keyset-paginated on
+    (collected_at, id), so every page is an index range scan no matter how
+    deep. With `fresh_since`, only items published (or, if undated,
+    created) since then are returned.
+    """
+    op = "lt" if newest_first else "gt"
+    fields = columns.split(",")
+    for key in ("collected_at", "id"):
+        if key not in fields:
+            fields.append(key)
+    columns = ",".join(fields)
+    
+    last = None
+    while True:
+        try:
+            query = get_supabase().table("raw_items").select(columns).gte("collected_at", since.isoformat())
+            if until is not None:
+                query = query.lt("collected_at", until.isoformat())
+            if fresh_since is not None:
+                cutoff = fresh_since.isoformat()
+                query = query.or_(f"published_at.gte.{cutoff},and(published_at.is.null,created_at.gte.{cutoff})")
+            if last is not None:
+                query = query.or_(f'collected_at.{op}."{last["collected_at"]}",'
+                                  f'and(collected_at.eq."{last["collected_at"]}",id.{op}.{last["id"]})')
+            query = query.order("collected_at", desc=newest_first).order("id", desc=newest_first)
+            rows = query.limit(page_size).execute().data
+        except Exception as e:
+            if not retry:
+                raise
+            # Resume from the last page read, not from the start
+            print(f"Connection error, retrying... ({e})")
+            reconnect()
+            retry = False
+            continue
+        
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last = rows[-1]
+
+
+def iter_raw_items_after(after_id, since, columns=RAW_ITEM_COLUMNS, page_size=READ_PAGE_SIZE, retry=True):
+    """Yield raw items with id > `after_id` collected since `since`, keyset-paginated on id."""
+    if "id" not in columns.split(","):
+        columns += ",id"
+    last_id = after_id
+    while True:
+        try:
+            query = get_supabase().table("raw_items").select(columns).gte("collected_at", since.isoformat())
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(page_size).execute().data
+        except Exception as e:
+            if not retry:
+                raise
+            print(f"Connection error, retrying... ({e})")
+            reconnect()
+            retry = False
+            continue
+        
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+class SupabaseBackend(StorageBackend):
+    """Tables in the hosted Supabase project (SUPABASE_URL / SUPABASE_KEY)."""
+    
+    name = "supabase"
+    read_workers = READ_WORKERS
+    
+    def save_raw_items(self, items, retry=True):
+        return bulk_upsert("raw_items", [i for i in items if i.get("url")], "url",
+                           attempts=WRITE_ATTEMPTS if retry else 1)
+    
+    def iter_raw_items(self, since, until=None, columns=RAW_ITEM_COLUMNS, fresh_since=None, newest_first=False):
+        return iter_raw_items(since, until, columns, fresh_since, newest_first)
+    
+    def iter_raw_items_after(self, after_id, since, columns=RAW_ITEM_COLUMNS):
+        return iter_raw_items_after(after_id, since, columns)
+    
+    def get_raw_item_urls(self):
+        return get_raw_item_urls()
+    
+    def clear_raw_items(self):
+        get_supabase().table("raw_items").delete().neq("title", "").execute()
+    
+    def clear_old_raw_items(self, cutoff):
+        get_supabase().table("raw_items").delete().lt("collected_at", cutoff.isoformat()).execute()
+    
+    def publish_daily(self, date, rows, sentiment):
+        """
+        Publish through the publish_daily function (one request, one
+        transaction). If it isn't installed this raises, unless
+        PUBLISH_NON_ATOMIC=1 allows a bulk replace without a transaction:
+        delete, then one insert per table.
+        """
+        supabase = get_supabase()
+        try:
+            supabase.rpc(PUBLISH_FUNCTION, {"p_date": date, "p_items": rows, "p_sentiment": sentiment}).execute()
+            return
+        except APIError as e:
+            if e.code not in ("PGRST202", "42883"):  # Function not found
+                raise
+            if not ALLOW_NON_ATOMIC_PUBLISH:
+                raise RuntimeError(f"{PUBLISH_FUNCTION}() is not installed: run utils/storage/publish_daily.sql "
+                                   f"in the Supabase SQL editor (or set PUBLISH_NON_ATOMIC=1 to publish "
+                                   f"without a transaction)") from e
+            print(f"  {PUBLISH_FUNCTION}() not installed, publishing without a transaction (PUBLISH_NON_ATOMIC=1)")
+        
+        supabase.table("daily_items").delete().eq("date", date).execute()
+        if rows:
+            supabase.table("daily_items").insert(rows, returning=ReturnMethod.minimal).execute()
+        supabase.table("daily_sentiment").delete().eq("date", date).execute()
+        supabase.table("daily_sentiment").insert(sentiment, returning=ReturnMethod.minimal).execute()
+    
+    def clear_daily_items(self):
+        get_supabase().table("daily_items").delete().neq("headline", "").execute()